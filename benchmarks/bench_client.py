@@ -0,0 +1,233 @@
+"""Benchmark the client's poll, write and decode paths against the simulator.
+
+Each scenario reports the requests and bytes it caused per cycle, the latency
+of its cycles, and the time spent in response processing, cache updates and
+change callbacks.  Results are written as JSON, to compare across commits:
+
+    python benchmarks/bench_client.py --output bench_results.json
+"""
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import functools
+import time
+
+from common import environment, load_library, summarize, write_results
+
+load_library()
+
+from proliphix.api import Proliphix  # noqa: E402
+from simulator import ProliphixSimulator  # noqa: E402
+
+PROPERTIES = [
+    "model",
+    "serial",
+    "firmware",
+    "name",
+    "temperature_scale",
+    "system_time",
+    "temperature_local",
+    "hvac_mode",
+    "hvac_state",
+    "fan_mode",
+    "fan_state",
+    "setback_heat",
+    "setback_cool",
+    "setback_status",
+    "current_period",
+    "current_class",
+    "relative_humidity",
+    "hold_duration",
+    "next_period",
+    "next_period_start",
+    "hold_until",
+    "current_schedule",
+]
+
+
+class Timers:
+    """Time spent in instrumented client methods."""
+
+    def __init__(self) -> None:
+        """Initialize the timers."""
+        self.totals: dict[str, int] = {}
+        self.calls: dict[str, int] = {}
+
+    def reset(self) -> None:
+        """Clear the timers."""
+        self.totals.clear()
+        self.calls.clear()
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Time a synchronous function under a name."""
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[name] = (
+                    self.totals.get(name, 0) + time.perf_counter_ns() - start
+                )
+                self.calls[name] = self.calls.get(name, 0) + 1
+
+        return timed
+
+    def report(self) -> dict[str, dict[str, float]]:
+        """Get the time spent per name."""
+        return {
+            name: {"calls": self.calls[name], "total_ms": total / 1e6}
+            for name, total in self.totals.items()
+        }
+
+
+def instrument(proliphix: Proliphix, timers: Timers) -> None:
+    """Time response processing, cache updates and change callbacks.
+
+    Cache updates include the time spent in the callbacks they run.
+    """
+    proliphix._process_response = timers.wrap(
+        "process_response", proliphix._process_response
+    )
+    proliphix._update_cache = timers.wrap("update_cache", proliphix._update_cache)
+    wrapped: dict[Callable, Callable] = {}
+    for callbacks in proliphix._change_callbacks.values():
+        for i, callback in enumerate(callbacks):
+            if callback not in wrapped:
+                wrapped[callback] = timers.wrap("callbacks", callback)
+            callbacks[i] = wrapped[callback]
+
+
+async def run_scenario(
+    name: str,
+    simulator: ProliphixSimulator,
+    timers: Timers,
+    iterations: int,
+    cycle: Callable[[int], Awaitable[None]],
+) -> dict:
+    """Run a scenario's cycles, and report what they cost."""
+    timers.reset()
+    before = dict(simulator.stats)
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await cycle(i)
+        latencies.append(time.perf_counter() - start)
+    traffic = {
+        key: (simulator.stats[key] - before[key]) / iterations
+        for key in ("requests", "get", "pdp", "oids", "bytes_in", "bytes_out")
+    }
+    result = {
+        "iterations": iterations,
+        "latency": summarize(latencies),
+        "per_cycle": traffic,
+        "cpu": timers.report(),
+    }
+    print(
+        f"{name:20} p50 {result['latency']['p50_ms']:8.2f} ms"
+        f"  p99 {result['latency']['p99_ms']:8.2f} ms"
+        f"  {traffic['requests']:5.1f} req"
+        f"  {traffic['bytes_in'] + traffic['bytes_out']:8.0f} B / cycle"
+    )
+    return result
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run the benchmarks."""
+    simulator = ProliphixSimulator(
+        args.model, latency=args.latency, latency_jitter=args.jitter, seed=1
+    )
+    results: dict = {
+        "environment": environment(),
+        "config": vars(args),
+        "scenarios": {},
+    }
+    scenarios = results["scenarios"]
+    timers = Timers()
+    async with simulator:
+
+        async def connect(_: int) -> None:
+            async with Proliphix(simulator.host, simulator.port) as proliphix:
+                instrument(proliphix, timers)
+                await proliphix.connect()
+
+        scenarios["connect"] = await run_scenario(
+            "connect", simulator, timers, args.connects, connect
+        )
+
+        async with Proliphix(
+            simulator.host, simulator.port, write_coalesce_window=0
+        ) as proliphix:
+            instrument(proliphix, timers)
+            await proliphix.connect()
+
+            async def first_poll(_: int) -> None:
+                await proliphix.poll()
+
+            scenarios["first_poll"] = await run_scenario(
+                "first_poll", simulator, timers, 1, first_poll
+            )
+
+            async def refresh_state(_: int) -> None:
+                await proliphix.refresh_state()
+
+            scenarios["refresh_state"] = await run_scenario(
+                "refresh_state", simulator, timers, args.iterations, refresh_state
+            )
+
+            async def refresh_schedule(_: int) -> None:
+                await proliphix.refresh_schedule()
+
+            scenarios["refresh_schedule"] = await run_scenario(
+                "refresh_schedule", simulator, timers, args.iterations, refresh_schedule
+            )
+
+            async def poll(_: int) -> None:
+                simulator.advance(60)
+                await proliphix.poll()
+
+            scenarios["poll"] = await run_scenario(
+                "poll", simulator, timers, args.iterations, poll
+            )
+
+            async def set_oids(i: int) -> None:
+                await proliphix.set_setback_heat(
+                    60 + i % 10, optimistic=True, confirm=True
+                )
+
+            scenarios["set_oids"] = await run_scenario(
+                "set_oids", simulator, timers, args.writes, set_oids
+            )
+
+            async def properties(_: int) -> None:
+                for _ in range(args.property_reads):
+                    for prop in PROPERTIES:
+                        getattr(proliphix, prop)
+
+            scenarios["properties"] = await run_scenario(
+                "properties", simulator, timers, args.iterations, properties
+            )
+            scenarios["properties"]["reads_per_cycle"] = args.property_reads * len(
+                PROPERTIES
+            )
+
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="NT150", help="simulated model")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--connects", type=int, default=20)
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument("--property-reads", type=int, default=100)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="simulated latency in seconds"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0, help="simulated jitter in seconds"
+    )
+    parser.add_argument("--output", default="bench_results.json")
+    asyncio.run(main(parser.parse_args()))
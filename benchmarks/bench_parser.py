@@ -0,0 +1,112 @@
+"""Benchmark compiled query plans against the parse_qs request/response path.
+
+For each OID set the client reads, a response is built from the simulator's
+values, including disconnected sensors (FAILED5) and empty values.  Encoding
+the request and decoding the response are timed both with query plans and
+the way the client did it before, with urlencode, parse_qs and OID lookups:
+
+    python benchmarks/bench_parser.py --output bench_results.json
+"""
+
+import argparse
+import statistics
+import timeit
+from urllib.parse import parse_qs, urlencode
+
+from common import environment, load_library, write_results
+
+load_library()
+
+from proliphix.api import OIDS_CORE, OIDS_STATE  # noqa: E402
+from proliphix.const import OID  # noqa: E402
+from proliphix.query import QueryPlan  # noqa: E402
+from proliphix.schedule import OIDS_WEEKLY_SCHEDULE  # noqa: E402
+from simulator import ProliphixSimulator  # noqa: E402
+
+
+def parse_qs_read(oids: list[OID], response: bytes) -> dict[OID, str]:
+    """Encode a read and decode its response with the general-purpose parser."""
+    urlencode({oid.value: None for oid in oids}).encode()
+    resp = {}
+    for oid_str, value in parse_qs(response.decode()).items():
+        resp[OID.get_by_val(oid_str)] = value[0] if value else ""
+    return resp
+
+
+def plan_read(plan: QueryPlan, response: bytes) -> dict[OID, str]:
+    """Encode a read and decode its response with a compiled plan."""
+    plan.body  # noqa: B018
+    return plan.parse(response)
+
+
+def time_per_call(func, number: int, repeat: int) -> dict[str, float]:
+    """Time a function, in microseconds per call."""
+    times = [
+        t / number * 1e6 for t in timeit.repeat(func, number=number, repeat=repeat)
+    ]
+    return {"min_us": min(times), "median_us": statistics.median(times)}
+
+
+def main(args: argparse.Namespace) -> None:
+    """Run the benchmarks."""
+    values = dict(ProliphixSimulator(args.model, seed=1).values)
+    # An unnamed thermostat reports an empty name
+    values[OID.COMMON_DEV_NAME] = ""
+    scenarios = {
+        "core": (OIDS_CORE, OIDS_CORE),
+        "state": (OIDS_STATE, OIDS_STATE),
+        "weekly_schedule": (OIDS_WEEKLY_SCHEDULE, OIDS_WEEKLY_SCHEDULE),
+        # Fields out of the expected order are looked up instead
+        "reordered": (OIDS_STATE, OIDS_STATE[::-1]),
+    }
+    results: dict = {
+        "environment": environment(),
+        "config": vars(args),
+        "scenarios": {},
+    }
+    for name, (oids, response_oids) in scenarios.items():
+        response = urlencode(
+            [(oid.value, values.get(oid, "")) for oid in response_oids]
+        ).encode()
+        plan = QueryPlan(oids)
+        expected = {
+            oid: value for oid, value in parse_qs_read(oids, response).items() if oid
+        }
+        if plan_read(plan, response) != expected:
+            raise AssertionError(f"{name}: the query plan parsed a different result")
+
+        baseline = time_per_call(
+            lambda oids=oids, response=response: parse_qs_read(oids, response),
+            args.number,
+            args.repeat,
+        )
+        compiled = time_per_call(
+            lambda plan=plan, response=response: plan_read(plan, response),
+            args.number,
+            args.repeat,
+        )
+        results["scenarios"][name] = {
+            "oids": len(response_oids),
+            "response_bytes": len(response),
+            "failed": sum(value == "FAILED5" for value in expected.values()),
+            "empty": len(response_oids) - len(expected),
+            "parse_qs": baseline,
+            "query_plan": compiled,
+            "speedup": baseline["min_us"] / compiled["min_us"],
+        }
+        print(
+            f"{name:16} {len(response_oids):4} OIDs"
+            f"  parse_qs {baseline['min_us']:8.2f} us"
+            f"  query plan {compiled['min_us']:8.2f} us"
+            f"  x{results['scenarios'][name]['speedup']:.2f}"
+        )
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="NT150", help="simulated model")
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing")
+    parser.add_argument("--repeat", type=int, default=5, help="timings per scenario")
+    parser.add_argument("--output", default="bench_results.json")
+    main(parser.parse_args())
@@ -0,0 +1,78 @@
+"""Helpers shared by the benchmarks."""
+
+import importlib.util
+import json
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+LIBRARY = ROOT / "custom_components" / "proliphix_plus" / "proliphix"
+
+
+def load_library() -> None:
+    """Make the client library importable as the top-level proliphix package.
+
+    The library lives inside the integration, which needs Home Assistant, and
+    next to modules that would shadow the standard library (calendar.py) if
+    the integration's directory were put on sys.path.
+    """
+    if "proliphix" in sys.modules:
+        return
+    spec = importlib.util.spec_from_file_location(
+        "proliphix",
+        LIBRARY / "__init__.py",
+        submodule_search_locations=[str(LIBRARY)],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["proliphix"] = module
+    spec.loader.exec_module(module)
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Get a percentile of values, by nearest rank."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(round(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(values: list[float]) -> dict[str, float | None]:
+    """Summarize latencies, in milliseconds."""
+    return {
+        "count": len(values),
+        "mean_ms": statistics.fmean(values) * 1000 if values else None,
+        "p50_ms": percentile(values, 50) * 1000 if values else None,
+        "p99_ms": percentile(values, 99) * 1000 if values else None,
+        "max_ms": max(values) * 1000 if values else None,
+    }
+
+
+def environment() -> dict[str, str | None]:
+    """Describe where the benchmark ran, to compare results across commits."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_results(path: str, results: dict) -> None:
+    """Write results as JSON."""
+    Path(path).write_text(json.dumps(results, indent=2, default=str) + "\n")
+    print(f"Results written to {path}")
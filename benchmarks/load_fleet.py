@@ -0,0 +1,160 @@
+"""Load test many thermostats polled from a single event loop.
+
+For each fleet size, N simulated thermostats are started on local ports and
+N clients poll them concurrently, like N coordinators sharing the Home
+Assistant event loop.  The test reports event loop lag, the total request
+rate, the memory held per client and the poll latency, so it shows how the
+per-device design degrades as the fleet grows:
+
+    python benchmarks/load_fleet.py --sizes 1,10,50,100 --output fleet.json
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+
+from common import environment, load_library, summarize, write_results
+
+load_library()
+
+from proliphix.api import Proliphix  # noqa: E402
+from simulator import ProliphixSimulator  # noqa: E402
+
+LAG_INTERVAL = 0.05
+
+# Allocations made by the simulators are not part of a client's footprint
+EXCLUDED_TRACES = [
+    tracemalloc.Filter(False, "*simulator.py"),
+    tracemalloc.Filter(False, "*aiohttp/web*"),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+]
+
+
+async def monitor_lag(samples: list[float]) -> None:
+    """Measure how late the event loop wakes up a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(loop.time() - start - LAG_INTERVAL, 0))
+
+
+async def poll_loop(
+    proliphix: Proliphix,
+    interval: float,
+    deadline: float,
+    latencies: list[float],
+    errors: list[str],
+) -> None:
+    """Poll like a coordinator would, until the deadline."""
+    # Spread the clients over the interval, as their setups would
+    await asyncio.sleep(random.uniform(0, interval))
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        try:
+            await proliphix.poll()
+        except ConnectionError as e:
+            errors.append(str(e))
+        latencies.append(time.monotonic() - start)
+        await asyncio.sleep(max(interval - (time.monotonic() - start), 0))
+
+
+async def run_fleet(size: int, args: argparse.Namespace) -> dict:
+    """Run a fleet of clients against their own simulators."""
+    simulators = [
+        ProliphixSimulator(
+            args.model,
+            serial=f"{i:010}",
+            latency=args.latency,
+            latency_jitter=args.jitter,
+            seed=i,
+        )
+        for i in range(size)
+    ]
+    await asyncio.gather(*(simulator.start() for simulator in simulators))
+    try:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot().filter_traces(EXCLUDED_TRACES)
+        clients = [
+            Proliphix(simulator.host, simulator.port) for simulator in simulators
+        ]
+        setup_start = time.monotonic()
+        await asyncio.gather(*(client.connect() for client in clients))
+        await asyncio.gather(*(client.poll() for client in clients))
+        setup_time = time.monotonic() - setup_start
+        after = tracemalloc.take_snapshot().filter_traces(EXCLUDED_TRACES)
+        tracemalloc.stop()
+        memory = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+        lag: list[float] = []
+        latencies: list[float] = []
+        errors: list[str] = []
+        requests_before = sum(s.stats["requests"] for s in simulators)
+        monitor = asyncio.create_task(monitor_lag(lag))
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(
+            *(
+                poll_loop(client, args.interval, deadline, latencies, errors)
+                for client in clients
+            )
+        )
+        elapsed = time.monotonic() - start
+        monitor.cancel()
+        requests = sum(s.stats["requests"] for s in simulators) - requests_before
+        await asyncio.gather(*(client.close() for client in clients))
+    finally:
+        await asyncio.gather(*(simulator.stop() for simulator in simulators))
+
+    result = {
+        "size": size,
+        "setup_s": setup_time,
+        "requests_per_s": requests / elapsed,
+        "memory_per_client_kb": memory / size / 1024,
+        "poll_latency": summarize(latencies),
+        "loop_lag": summarize(lag),
+        "errors": len(errors),
+    }
+    print(
+        f"N={size:4}  {result['requests_per_s']:8.1f} req/s"
+        f"  poll p99 {result['poll_latency']['p99_ms']:8.2f} ms"
+        f"  lag p99 {result['loop_lag']['p99_ms']:7.2f} ms"
+        f"  {result['memory_per_client_kb']:7.1f} KiB/client"
+        f"  {len(errors)} errors"
+    )
+    return result
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run the load test for each fleet size."""
+    random.seed(1)
+    results: dict = {
+        "environment": environment(),
+        "config": vars(args),
+        "fleets": [],
+    }
+    for size in (int(size) for size in args.sizes.split(",")):
+        results["fleets"].append(await run_fleet(size, args))
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,50,100", help="fleet sizes")
+    parser.add_argument("--model", default="NT150", help="simulated model")
+    parser.add_argument(
+        "--interval", type=float, default=1, help="poll interval in seconds"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10, help="seconds to poll each fleet"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="simulated latency in seconds"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.01, help="simulated jitter in seconds"
+    )
+    parser.add_argument("--output", default="bench_results.json")
+    asyncio.run(main(parser.parse_args()))
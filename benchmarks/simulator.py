@@ -0,0 +1,518 @@
+"""Simulated Proliphix thermostat, for development and benchmarks.
+
+The simulator serves /get and /pdp like the thermostat's embedded web server,
+from an OID store seeded for the simulated model.  A simple thermal model
+drives the temperature and HVAC state, the schedule drives the setbacks, and
+the system clock can be moved at will.  Latency, dropped connections and the
+server's concurrency limit can be injected to reproduce a real device.
+
+It is not part of the integration, and runs against the client library
+loaded by common.load_library().
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+import logging
+import random
+import time
+from types import TracebackType
+from urllib.parse import parse_qsl, urlencode
+
+from aiohttp import BasicAuth, web
+from common import load_library
+
+load_library()
+
+from proliphix.const import (  # noqa: E402
+    OID,
+    CurrentPeriod,
+    FanMode,
+    FanState,
+    HVACMode,
+    HVACState,
+    ScheduleClass,
+    SetbackStatus,
+    TemperatureScale,
+)
+from proliphix.schedule import (  # noqa: E402
+    OIDS_DEFAULT_CLASS,
+    OIDS_WEEKLY_SCHEDULE,
+    SCHEDULE_CLASSES,
+    WeeklySchedule,
+)
+from proliphix.state import SENSOR_FAILED  # noqa: E402
+
+_LOGGER = logging.getLogger(__name__)
+
+# OIDs only supported by some models
+MODEL_OIDS: dict[str, set[OID]] = {
+    "NT150": {
+        OID.THERM_RELATIVE_HUMIDITY,
+        OID.THERM_CONFIG_HUMIDITY_COOL,
+        OID.COMMON_ALARM_STATUS_HIGH_HUMIDITY,
+    },
+}
+MODEL_ONLY_OIDS: set[OID] = set().union(*MODEL_OIDS.values())
+
+# Default schedule: (start in minutes, heat, cool) per period, in tenths
+DEFAULT_PERIODS = {
+    ScheduleClass.IN: [
+        (360, 680, 760),
+        (480, 680, 760),
+        (1080, 700, 750),
+        (1320, 640, 780),
+    ],
+    ScheduleClass.OUT: [
+        (360, 680, 760),
+        (480, 620, 800),
+        (1080, 700, 750),
+        (1320, 640, 780),
+    ],
+    ScheduleClass.AWAY: [
+        (360, 600, 820),
+        (480, 600, 820),
+        (1080, 600, 820),
+        (1320, 600, 820),
+    ],
+}
+DEFAULT_DAY_CLASSES = [ScheduleClass.OUT] + [ScheduleClass.IN] * 5 + [ScheduleClass.OUT]
+
+# Substep of the thermal model, in seconds
+THERMAL_STEP: float = 10
+MAX_THERMAL_STEPS: int = 10000
+
+
+class SimulatedClock:
+    """Controllable local clock of the simulated thermostat.
+
+    The clock runs speed times faster than real time from its start, and can
+    be moved with advance() and set().
+    """
+
+    def __init__(self, start: datetime | None = None, speed: float = 1) -> None:
+        """Initialize the clock, at the current local time by default."""
+        self.speed = speed
+        self.set(start or datetime.now())
+
+    def now(self) -> datetime:
+        """Get the current local time, without a timezone."""
+        elapsed = (time.monotonic() - self._started) * self.speed + self._offset
+        return self._start + timedelta(seconds=elapsed)
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward."""
+        self._offset += seconds
+
+    def set(self, when: datetime) -> None:
+        """Set the current local time."""
+        self._start = when.replace(tzinfo=None)
+        self._started = time.monotonic()
+        self._offset = 0.0
+
+    def system_time_secs(self) -> int:
+        """Get the system time as the thermostat reports it.
+
+        The thermostat reports its local time as if it were UTC.
+        """
+        return int(self.now().replace(tzinfo=UTC).timestamp())
+
+
+class ThermalModel:
+    """Simple model of a house heated and cooled by the HVAC system.
+
+    The indoor temperature drifts toward the outdoor temperature, and each
+    running HVAC stage pushes it in its own direction.  Rates are in degrees
+    of the thermostat's scale per second.
+    """
+
+    def __init__(
+        self,
+        temperature: float = 70,
+        outdoor_temperature: float = 40,
+        loss_rate: float = 0.0001,
+        heat_rate: float = 0.006,
+        cool_rate: float = 0.006,
+        differential: float = 0.5,
+        second_stage_offset: float = 2,
+    ) -> None:
+        """Initialize the model."""
+        self.temperature = temperature
+        self.outdoor_temperature = outdoor_temperature
+        self.loss_rate = loss_rate
+        self.heat_rate = heat_rate
+        self.cool_rate = cool_rate
+        self.differential = differential
+        self.second_stage_offset = second_stage_offset
+        self.hvac_state = HVACState.OFF
+
+    def control(self, mode: HVACMode, heat: float, cool: float) -> HVACState:
+        """Pick the HVAC state for the current temperature and setbacks."""
+        temperature = self.temperature
+        heating = self.hvac_state in (HVACState.HEAT, HVACState.HEAT_2)
+        cooling = self.hvac_state in (HVACState.COOL, HVACState.COOL_2)
+        if mode in (HVACMode.HEAT, HVACMode.AUTO) and (
+            temperature < heat - self.differential
+            or (heating and temperature < heat + self.differential)
+        ):
+            if temperature < heat - self.second_stage_offset:
+                return HVACState.HEAT_2
+            return HVACState.HEAT
+        if mode in (HVACMode.COOL, HVACMode.AUTO) and (
+            temperature > cool + self.differential
+            or (cooling and temperature > cool - self.differential)
+        ):
+            if temperature > cool + self.second_stage_offset:
+                return HVACState.COOL_2
+            return HVACState.COOL
+        return HVACState.OFF
+
+    def step(self, seconds: float, mode: HVACMode, heat: float, cool: float) -> None:
+        """Advance the model."""
+        self.hvac_state = self.control(mode, heat, cool)
+        rate = (self.outdoor_temperature - self.temperature) * self.loss_rate
+        if self.hvac_state == HVACState.HEAT:
+            rate += self.heat_rate
+        elif self.hvac_state == HVACState.HEAT_2:
+            rate += 2 * self.heat_rate
+        elif self.hvac_state == HVACState.COOL:
+            rate -= self.cool_rate
+        elif self.hvac_state == HVACState.COOL_2:
+            rate -= 2 * self.cool_rate
+        self.temperature += rate * seconds
+
+
+class ProliphixSimulator:
+    """Simulated Proliphix thermostat, served over HTTP."""
+
+    def __init__(
+        self,
+        model: str = "NT150",
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        username: str = "admin",
+        password: str = "admin",
+        serial: str = "0123456789",
+        clock: SimulatedClock | None = None,
+        thermal: ThermalModel | None = None,
+        latency: float = 0,
+        latency_jitter: float = 0,
+        drop_rate: float = 0,
+        max_concurrency: int = 1,
+        write_delay: float = 0,
+        sensor_noise: float = 0,
+        keepalive: bool = True,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the simulator.
+
+        Requests take latency seconds, plus up to latency_jitter more, and a
+        drop_rate share of them have their connection dropped without a
+        response.  Requests beyond max_concurrency at a time are rejected, like
+        the embedded server does.  Written values are echoed right away, but
+        only take effect after write_delay seconds.  Sensor readings vary by up
+        to sensor_noise degrees.
+        """
+        self.model = model
+        self.host = host
+        self.port = port
+        self._auth = BasicAuth(username, password)
+        self.clock = clock or SimulatedClock()
+        self.thermal = thermal or ThermalModel()
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.drop_rate = drop_rate
+        self.max_concurrency = max_concurrency
+        self.write_delay = write_delay
+        self.sensor_noise = sensor_noise
+        self.keepalive = keepalive
+        self._random = random.Random(seed)
+
+        self.values: dict[OID, str] = self._default_values(serial)
+        self.stats: dict[str, int] = dict.fromkeys(
+            (
+                "requests",
+                "get",
+                "pdp",
+                "oids",
+                "bytes_in",
+                "bytes_out",
+                "drops",
+                "rejected",
+                "unauthorized",
+            ),
+            0,
+        )
+        self._active = 0
+        self._pending_writes: list[tuple[float, dict[OID, str]]] = []
+        self._schedule: WeeklySchedule | None = None
+        self._override_period: CurrentPeriod | None = None
+        self._last_step = self.clock.now()
+        self._runner: web.AppRunner | None = None
+
+    def _default_values(self, serial: str) -> dict[OID, str]:
+        """Seed the OID store for the simulated model."""
+        values = {
+            oid: "0"
+            for oid in OID
+            if oid not in MODEL_ONLY_OIDS or oid in MODEL_OIDS.get(self.model, ())
+        }
+        values.update(
+            {
+                OID.SYSTEM_MIM_MODEL_NUMBER: self.model,
+                OID.SERIAL_NUMBER: serial,
+                OID.FIRMWARE_VERSION: "1.0.0",
+                OID.COMMON_DEV_NAME: f"Simulated {self.model}",
+                OID.SITE_NAME: "Simulator",
+                OID.TEMPERATURE_SCALE: TemperatureScale.FARENHEIT.value,
+                OID.THERM_HVAC_MODE: HVACMode.AUTO.value,
+                OID.THERM_HVAC_STATE: HVACState.OFF.value,
+                OID.THERM_FAN_MODE: FanMode.AUTO.value,
+                OID.THERM_FAN_STATE: FanState.OFF.value,
+                OID.THERM_SETBACK_STATUS: SetbackStatus.NORMAL.value,
+                OID.THERM_HOLD_DURATION: "0",
+                OID.THERM_SENSOR_TEMP_REMOTE_1: SENSOR_FAILED,
+                OID.THERM_SENSOR_TEMP_REMOTE_2: SENSOR_FAILED,
+            }
+        )
+        if OID.THERM_RELATIVE_HUMIDITY in values:
+            values[OID.THERM_RELATIVE_HUMIDITY] = "450"
+        for schedule_class, periods in DEFAULT_PERIODS.items():
+            for period, (start, heat, cool) in enumerate(periods, 1):
+                name = f"{schedule_class.name}_PERIOD_{period}"
+                values[OID[f"THERM_PERIOD_START_{name}"]] = str(start)
+                values[OID[f"THERM_PERIOD_SETBACK_HEAT_{name}"]] = str(heat)
+                values[OID[f"THERM_PERIOD_SETBACK_COOL_{name}"]] = str(cool)
+                values[OID[f"THERM_PERIOD_SETBACK_FAN_{name}"]] = "0"
+        for oid, schedule_class in zip(
+            OIDS_DEFAULT_CLASS, DEFAULT_DAY_CLASSES, strict=True
+        ):
+            values[oid] = schedule_class.value
+        return values
+
+    @property
+    def url(self) -> str:
+        """Get the base URL of the simulator."""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """Start serving requests."""
+        app = web.Application()
+        app.router.add_post("/get", self._handle_get)
+        app.router.add_post("/pdp", self._handle_pdp)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+        _LOGGER.debug("Simulated %s listening on %s", self.model, self.url)
+
+    async def stop(self) -> None:
+        """Stop serving requests."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "ProliphixSimulator":
+        """Start the simulator when entering the async context."""
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Stop the simulator when leaving the async context."""
+        await self.stop()
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward and let the thermal model catch up."""
+        self.clock.advance(seconds)
+        self.update()
+
+    def set_values(self, oid_values: dict[OID, str]) -> None:
+        """Change OID values, as if they were written to the thermostat."""
+        self._apply_write(
+            {oid: str(getattr(v, "value", v)) for oid, v in oid_values.items()}
+        )
+        self.update()
+
+    def update(self) -> None:
+        """Bring the derived values up to date with the clock."""
+        now = time.monotonic()
+        while self._pending_writes and self._pending_writes[0][0] <= now:
+            self._apply_write(self._pending_writes.pop(0)[1])
+
+        current = self.clock.now()
+        self._update_schedule(current)
+        values = self.values
+        mode = HVACMode._value2member_map_.get(values[OID.THERM_HVAC_MODE])
+        heat = int(values[OID.THERM_SETBACK_HEAT]) / 10
+        cool = int(values[OID.THERM_SETBACK_COOL]) / 10
+        elapsed = (current - self._last_step).total_seconds()
+        self._last_step = current
+        if elapsed > 0:
+            steps = min(max(int(elapsed / THERMAL_STEP), 1), MAX_THERMAL_STEPS)
+            for _ in range(steps):
+                self.thermal.step(elapsed / steps, mode, heat, cool)
+        else:
+            self.thermal.hvac_state = self.thermal.control(mode, heat, cool)
+
+        hvac_state = self.thermal.hvac_state
+        values[OID.SYSTEM_TIME_SECS] = str(self.clock.system_time_secs())
+        values[OID.THERM_HVAC_STATE] = hvac_state.value
+        fan_on = hvac_state != HVACState.OFF or values[OID.THERM_FAN_MODE] == (
+            FanMode.ON.value
+        )
+        values[OID.THERM_FAN_STATE] = (FanState.ON if fan_on else FanState.OFF).value
+        temperature = self.thermal.temperature
+        if self.sensor_noise:
+            temperature += self._random.uniform(-self.sensor_noise, self.sensor_noise)
+        values[OID.THERM_SENSOR_TEMP_LOCAL] = str(round(temperature * 10))
+
+    def _update_schedule(self, current: datetime) -> None:
+        """Apply the schedule's setbacks, unless they are held or overridden."""
+        if self._schedule is None:
+            self._schedule = WeeklySchedule(self.values)
+        setpoints = self._schedule.setpoints_at(current)
+        if setpoints is None:
+            return
+        values = self.values
+        values[OID.THERM_CURRENT_CLASS] = setpoints.schedule_class.value
+        values[OID.THERM_CURRENT_PERIOD] = setpoints.period.value
+        status = values[OID.THERM_SETBACK_STATUS]
+        if (
+            status == SetbackStatus.OVERRIDE.value
+            and setpoints.period != self._override_period
+        ):
+            # An override lasts until the next period starts
+            status = values[OID.THERM_SETBACK_STATUS] = SetbackStatus.NORMAL.value
+        if status == SetbackStatus.NORMAL.value:
+            if setpoints.heat is not None:
+                values[OID.THERM_SETBACK_HEAT] = str(round(setpoints.heat * 10))
+            if setpoints.cool is not None:
+                values[OID.THERM_SETBACK_COOL] = str(round(setpoints.cool * 10))
+
+    def _apply_write(self, oid_values: dict[OID, str]) -> None:
+        """Apply written values, with their side effects on the thermostat."""
+        setbacks = {OID.THERM_SETBACK_HEAT, OID.THERM_SETBACK_COOL}
+        if (
+            setbacks & oid_values.keys()
+            and OID.THERM_SETBACK_STATUS not in oid_values
+            and self.values[OID.THERM_SETBACK_STATUS] == SetbackStatus.NORMAL.value
+        ):
+            # Changing a setback overrides the schedule until the next period
+            self.values[OID.THERM_SETBACK_STATUS] = SetbackStatus.OVERRIDE.value
+            self._override_period = CurrentPeriod._value2member_map_.get(
+                self.values[OID.THERM_CURRENT_PERIOD]
+            )
+        if oid_values.get(OID.THERM_SETBACK_STATUS) == SetbackStatus.OVERRIDE.value:
+            self._override_period = CurrentPeriod._value2member_map_.get(
+                self.values[OID.THERM_CURRENT_PERIOD]
+            )
+        self.values.update(oid_values)
+        if not oid_values.keys().isdisjoint(OIDS_WEEKLY_SCHEDULE):
+            self._schedule = None
+
+    def _writable(self, oid: OID | None, value: str) -> bool:
+        """Whether the thermostat accepts a written value."""
+        if oid is None or oid not in self.values:
+            return False
+        if oid in OIDS_DEFAULT_CLASS:
+            return value in {c.value for c in SCHEDULE_CLASSES}
+        return True
+
+    async def _begin(self, request: web.Request) -> bytes | web.Response:
+        """Apply the server's limits to a request, and read its body.
+
+        Unless a response is returned, the request counts against the
+        concurrency limit until the handler calls _end().
+        """
+        self.stats["requests"] += 1
+        if request.headers.get("Authorization") != self._auth.encode():
+            self.stats["unauthorized"] += 1
+            return web.Response(
+                status=401, headers={"WWW-Authenticate": 'Basic realm="Proliphix"'}
+            )
+        if self._active >= self.max_concurrency:
+            self.stats["rejected"] += 1
+            return web.Response(status=503)
+        self._active += 1
+        try:
+            body = await request.read()
+        except BaseException:
+            self._active -= 1
+            raise
+        self.stats["bytes_in"] += len(body)
+        return body
+
+    def _end(self) -> None:
+        """Release a request's place within the concurrency limit."""
+        self._active -= 1
+
+    async def _respond(self, request: web.Request, text: str) -> web.StreamResponse:
+        """Send a response after the simulated latency, or drop the connection."""
+        delay = self.latency + self._random.uniform(0, self.latency_jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.drop_rate and self._random.random() < self.drop_rate:
+            self.stats["drops"] += 1
+            if request.transport is not None:
+                request.transport.abort()
+            return web.Response()
+        response = web.Response(text=text, content_type="text/plain")
+        if not self.keepalive:
+            response.force_close()
+        self.stats["bytes_out"] += len(response.body)
+        return response
+
+    async def _handle_get(self, request: web.Request) -> web.StreamResponse:
+        """Read OID values."""
+        body = await self._begin(request)
+        if isinstance(body, web.Response):
+            return body
+        try:
+            self.update()
+            self.stats["get"] += 1
+            fields = []
+            for field in body.decode().split("&"):
+                oid_str = field.partition("=")[0]
+                if not oid_str:
+                    continue
+                oid = OID.get_by_val(oid_str)
+                fields.append((oid_str, self.values.get(oid, "") if oid else ""))
+            self.stats["oids"] += len(fields)
+            return await self._respond(request, urlencode(fields))
+        finally:
+            self._end()
+
+    async def _handle_pdp(self, request: web.Request) -> web.StreamResponse:
+        """Write OID values."""
+        body = await self._begin(request)
+        if isinstance(body, web.Response):
+            return body
+        try:
+            self.update()
+            self.stats["pdp"] += 1
+            written: dict[OID, str] = {}
+            for oid_str, value in parse_qsl(body.decode(), keep_blank_values=True):
+                oid = OID.get_by_val(oid_str)
+                if self._writable(oid, value):
+                    written[oid] = value
+            self.stats["oids"] += len(written)
+            if self.write_delay:
+                self._pending_writes.append(
+                    (time.monotonic() + self.write_delay, written)
+                )
+            else:
+                self._apply_write(written)
+                self.update()
+            return await self._respond(
+                request,
+                urlencode([(oid.value, value) for oid, value in written.items()]),
+            )
+        finally:
+            self._end()
@@ -2,32 +2,46 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+from collections.abc import Callable
+from datetime import datetime, timedelta
 import logging
+import time
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT, CONF_SSL, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
     UpdateFailed,
 )
 
-from .const import DOMAIN
+from .const import CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL, DOMAIN
+from .filter import FILTERED_VALUES, FilterConfig, StateFilter
 from .proliphix.api import Proliphix
+from .proliphix.const import OID
 
 # PLATFORMS: list[Platform] = [Platform.CLIMATE, Platform.SENSOR, Platform.BINARY_SENSOR]
-PLATFORMS: list[Platform] = [Platform.CLIMATE, Platform.SENSOR]
+PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.CLIMATE, Platform.SENSOR]
 
 _LOGGER = logging.getLogger(__name__)
 
 UPDATE_INTERVAL = 15
 UPDATE_TIMEOUT = 30
 
+# Adaptive polling: poll quickly while the thermostat is active, and back off
+# toward the configured maximum interval once nothing has changed for a while.
+MIN_UPDATE_INTERVAL = 5
+ACTIVE_CYCLES = 4
+IDLE_CYCLES_BEFORE_BACKOFF = 4
+PERIOD_START_MARGIN = 5
+
+# OIDs that change on every poll and say nothing about thermostat activity
+ACTIVITY_IGNORED_OIDS = {OID.SYSTEM_TIME_SECS}
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Proliphix from a config entry."""
@@ -37,22 +51,34 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         entry.data[CONF_HOST],
         entry.data[CONF_PORT],
         entry.data[CONF_SSL],
+        entry.options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL),
     )
     try:
         await coordinator.connect()
     except Exception as ex:
         _LOGGER.error("Error connecting to Proliphix: %s", ex)
+        await coordinator.proliphix.close()
         raise ConfigEntryNotReady from ex
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running coordinator."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.max_update_interval = entry.options.get(
+        CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.proliphix.close()
 
     return unload_ok
 
@@ -60,7 +86,14 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 class ProliphixDataUpdateCoordinator(DataUpdateCoordinator):
     """Data update coordinator for Proliphix."""
 
-    def __init__(self, hass: HomeAssistant, host: str, port: int, ssl: bool) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        ssl: bool,
+        max_update_interval: int = DEFAULT_MAX_UPDATE_INTERVAL,
+    ) -> None:
         """Initialize the coordinator."""
         super().__init__(
             hass,
@@ -68,30 +101,109 @@ class ProliphixDataUpdateCoordinator(DataUpdateCoordinator):
             name=f"{host}:{port}",
             update_interval=timedelta(seconds=UPDATE_INTERVAL),
         )
-        session = async_get_clientsession(hass)
-        self.proliphix: Proliphix = Proliphix(
-            host=host, port=port, ssl=ssl, session=session
-        )
+        # Use a dedicated connection, tuned for the thermostat's web server
+        self.proliphix: Proliphix = Proliphix(host=host, port=port, ssl=ssl)
+        self.max_update_interval = max_update_interval
+        self._changed_oids: set[OID] = set()
+        # OIDs changed since the entities were last updated
+        self.changed_oids: set[OID] = set()
+        self._updating = False
+        self._active_cycles = 0
+        self._idle_cycles = 0
+        self.proliphix.add_update_listener(self._handle_proliphix_changes)
 
     async def connect(self) -> None:
         """Connect to Proliphix."""
         await self.proliphix.connect()
-        await self.proliphix.refresh_state()
-        await self.proliphix.refresh_schedule()
+        await self.proliphix.poll()
 
     async def _async_update_data(self) -> None:
         """Fetch data from Proliphix."""
+        self._updating = True
         try:
-            await self.proliphix.refresh_state()
-            await self.proliphix.refresh_schedule()
-        except TimeoutError as err:
-            raise UpdateFailed(f"Timeout while communicating with API: {err}") from err
+            await self.proliphix.poll()
+        except (ConnectionError, TimeoutError) as err:
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+        finally:
+            self._updating = False
+            self._adapt_update_interval()
+
+    @callback
+    def _handle_proliphix_changes(self, changes: dict[OID, list[str]]) -> None:
+        """Collect the OIDs changed since the last update cycle.
+
+        Changes that happen outside of a coordinator update (optimistic writes,
+        write confirmations and rollbacks) are pushed to the entities right away.
+        """
+        self._changed_oids.update(changes)
+        self.changed_oids.update(changes)
+        if not self._updating:
+            self.async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the entities, then start collecting changed OIDs again."""
+        super().async_update_listeners()
+        self.changed_oids = set()
+
+    @callback
+    def async_note_write(self) -> None:
+        """Poll quickly for a while after a value is written to the thermostat.
+
+        The written values have already been confirmed, so nothing is read
+        now, but the next refresh, which may have been scheduled with a backed
+        off interval, is rescheduled at the quick interval.
+        """
+        self._active_cycles = ACTIVE_CYCLES
+        self._idle_cycles = 0
+        self.update_interval = timedelta(seconds=MIN_UPDATE_INTERVAL)
+        self._schedule_refresh()
+
+    @callback
+    def _adapt_update_interval(self) -> None:
+        """Pick the next update interval based on recent thermostat activity."""
+        changed_oids = self._changed_oids - ACTIVITY_IGNORED_OIDS
+        self._changed_oids = set()
+
+        if OID.THERM_HVAC_STATE in changed_oids:
+            self._active_cycles = ACTIVE_CYCLES
+        if changed_oids:
+            self._idle_cycles = 0
+        else:
+            self._idle_cycles += 1
+
+        if self._active_cycles > 0:
+            self._active_cycles -= 1
+            interval = MIN_UPDATE_INTERVAL
+        elif self._idle_cycles >= IDLE_CYCLES_BEFORE_BACKOFF:
+            backoff = 2 ** (self._idle_cycles - IDLE_CYCLES_BEFORE_BACKOFF + 1)
+            interval = min(UPDATE_INTERVAL * backoff, self.max_update_interval)
+        else:
+            interval = UPDATE_INTERVAL
+
+        # Don't sleep through the start of the next schedule period
+        system_time = self.proliphix.system_time
+        next_period_start = self.proliphix.next_period_start
+        if system_time is not None and next_period_start is not None:
+            until_next_period = (next_period_start - system_time).total_seconds()
+            if 0 < until_next_period < interval:
+                interval = max(
+                    until_next_period + PERIOD_START_MARGIN, MIN_UPDATE_INTERVAL
+                )
+
+        if self.update_interval != timedelta(seconds=interval):
+            _LOGGER.debug("Changing update interval to %s seconds", interval)
+            self.update_interval = timedelta(seconds=interval)
 
 
 class ProliphixEntity(CoordinatorEntity[ProliphixDataUpdateCoordinator]):
     """Base class for Proliphix entities."""
 
     _attr_has_entity_name = True
+    # OIDs the entity's state is derived from, or None to update on any change
+    _oids: frozenset[OID] | None = None
+    # Filters for noisy OIDs, which only cause a state write when they pass
+    _filter_configs: dict[OID, FilterConfig] = {}
 
     def __init__(
         self,
@@ -100,8 +212,85 @@ class ProliphixEntity(CoordinatorEntity[ProliphixDataUpdateCoordinator]):
     ) -> None:
         """Init Proliphix entity."""
         self.proliphix = coordinator.proliphix
+        self._last_available: bool | None = None
+        self._filters = {
+            oid: StateFilter(config) for oid, config in self._filter_configs.items()
+        }
+        self._recheck_unsub: Callable[[], None] | None = None
         super().__init__(coordinator)
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the entity's OIDs or availability changed.
+
+        Changes of filtered OIDs alone are written only once the filters let
+        them through, and are checked again later if they are held back.
+        """
+        if self._oids is not None and self.available == self._last_available:
+            changed = self._oids & self.coordinator.changed_oids
+            if not changed:
+                return
+            if changed <= self._filters.keys() and not self._filters_pass(changed):
+                self._schedule_recheck()
+                return
+        self._publish()
+
+    @callback
+    def _publish(self) -> None:
+        """Write the state, and record the values the filters published."""
+        now = time.monotonic()
+        state = self.proliphix.state
+        for oid, state_filter in self._filters.items():
+            state_filter.published(FILTERED_VALUES[oid](state), now)
+        if self._recheck_unsub is not None:
+            self._recheck_unsub()
+            self._recheck_unsub = None
+        self._last_available = self.available
+        super()._handle_coordinator_update()
+
+    def _filters_pass(self, oids: set[OID]) -> bool:
+        """Whether any of the filters of OIDs lets its current value through."""
+        now = time.monotonic()
+        state = self.proliphix.state
+        return any(
+            self._filters[oid].check(FILTERED_VALUES[oid](state), now) for oid in oids
+        )
+
+    @callback
+    def _schedule_recheck(self) -> None:
+        """Check held back values again when a filter may let them through."""
+        now = time.monotonic()
+        state = self.proliphix.state
+        delays = [
+            delay
+            for oid, state_filter in self._filters.items()
+            if (delay := state_filter.recheck_in(FILTERED_VALUES[oid](state), now))
+            is not None
+        ]
+        if self._recheck_unsub is not None:
+            self._recheck_unsub()
+            self._recheck_unsub = None
+        if delays:
+            self._recheck_unsub = async_call_later(
+                self.hass, min(delays), self._async_recheck
+            )
+
+    @callback
+    def _async_recheck(self, _now: datetime) -> None:
+        """Write held back values that the filters now let through."""
+        self._recheck_unsub = None
+        if self._filters_pass(self._filters.keys()):
+            self._publish()
+        else:
+            self._schedule_recheck()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel any pending check of held back values."""
+        if self._recheck_unsub is not None:
+            self._recheck_unsub()
+            self._recheck_unsub = None
+        await super().async_will_remove_from_hass()
+
     @property
     def unique_id(self) -> str:
         """Return the unique id."""
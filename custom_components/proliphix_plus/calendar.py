@@ -0,0 +1,140 @@
+"""Calendar for Proliphix."""
+
+from datetime import datetime, timedelta
+import logging
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from . import ProliphixDataUpdateCoordinator, ProliphixEntity
+from .const import DOMAIN
+from .proliphix.schedule import (
+    OIDS_WEEKLY_SCHEDULE,
+    ScheduleEvent,
+    ScheduleIndex,
+    SpecialDay,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Days around today covered by the schedule index.  Queries outside of this
+# range rebuild the index around the requested range.
+INDEX_DAYS_BEFORE = 7
+INDEX_DAYS_AFTER = 62
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Proliphix calendars from config entry."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    async_add_entities([ProliphixScheduleCalendar(coordinator)])
+
+
+def _to_local(when: datetime) -> datetime:
+    """Convert to the naive local time used by the schedule."""
+    return dt_util.as_local(when).replace(tzinfo=None)
+
+
+def _from_local(when: datetime) -> datetime:
+    """Convert from the naive local time used by the schedule."""
+    return when.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+class ProliphixScheduleCalendar(ProliphixEntity, CalendarEntity):
+    """Calendar of the thermostat's schedule periods and special days."""
+
+    _attr_name = "Schedule"
+    _oids = frozenset(OIDS_WEEKLY_SCHEDULE)
+
+    def __init__(
+        self,
+        coordinator: ProliphixDataUpdateCoordinator,
+    ) -> None:
+        """Set up the instance."""
+        super().__init__(coordinator)
+        self._index: ScheduleIndex | None = None
+
+    def _get_index(self, start: datetime, end: datetime) -> ScheduleIndex | None:
+        """Get a schedule index covering a time range.
+
+        The index is only rebuilt when the weekly schedule has changed, or when
+        the range is not covered by it.
+        """
+        schedule = self.proliphix.weekly_schedule
+        if schedule is None:
+            return None
+        index = self._index
+        if (
+            index is None
+            or index.schedule is not schedule
+            or not index.covers(start, end)
+        ):
+            today = dt_util.now().date()
+            first_day = min(start.date(), today - timedelta(days=INDEX_DAYS_BEFORE))
+            last_day = max(
+                end.date() + timedelta(days=1),
+                today + timedelta(days=INDEX_DAYS_AFTER),
+            )
+            _LOGGER.debug("Indexing schedule from %s to %s", first_day, last_day)
+            index = ScheduleIndex(schedule, first_day, (last_day - first_day).days)
+            self._index = index
+        return index
+
+    @staticmethod
+    def _period_event(index: ScheduleIndex, event: ScheduleEvent) -> CalendarEvent:
+        """Build a calendar event for a schedule period."""
+        heat, cool, _ = index.schedule.setpoints(event.schedule_class, event.period)
+        return CalendarEvent(
+            start=_from_local(event.start),
+            end=_from_local(event.end),
+            summary=f"{event.schedule_class.name.title()}: {event.period.name.title()}",
+            description=f"Heat to {heat}, cool to {cool}",
+        )
+
+    @staticmethod
+    def _special_day_event(special_day: SpecialDay) -> CalendarEvent:
+        """Build an all-day calendar event for a special day."""
+        return CalendarEvent(
+            start=special_day.start,
+            end=special_day.end,
+            summary=f"Special day: {special_day.schedule_class.name.title()}",
+        )
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the schedule period in effect."""
+        now = _to_local(dt_util.now())
+        index = self._get_index(now, now)
+        if index is None:
+            return None
+        event = index.event_at(now)
+        return self._period_event(index, event) if event is not None else None
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Return the schedule periods and special days within a range."""
+        start = _to_local(start_date)
+        end = _to_local(end_date)
+        index = self._get_index(start, end)
+        if index is None:
+            return []
+        events = [
+            self._special_day_event(special_day)
+            # Special days are whole days, up to the last day touched by the range
+            for special_day in index.special_days_between(
+                start.date(),
+                (end - timedelta(microseconds=1)).date() + timedelta(days=1),
+            )
+        ]
+        events.extend(
+            self._period_event(index, event)
+            for event in index.events_between(start, end)
+        )
+        return events
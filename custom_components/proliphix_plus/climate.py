@@ -1,6 +1,5 @@
 """Climate for Proliphix."""
 
-import asyncio
 import logging
 
 from homeassistant.components.climate import (
@@ -26,6 +25,7 @@ from .const import (
     PRESET_OUT,
     PRESET_OVERRIDE,
 )
+from .filter import HUMIDITY_FILTER, TEMPERATURE_FILTER
 from .proliphix.const import (
     OID,
     FanMode as PlxFanMode,
@@ -61,6 +61,24 @@ class ProliphixClimate(ProliphixEntity, ClimateEntity):
     _attr_precision = PRECISION_TENTHS
     _attr_temperature_step = PRECISION_WHOLE
     _attr_name = "Thermostat"
+    _oids = frozenset(
+        {
+            OID.TEMPERATURE_SCALE,
+            OID.THERM_SENSOR_TEMP_LOCAL,
+            OID.THERM_RELATIVE_HUMIDITY,
+            OID.THERM_HVAC_MODE,
+            OID.THERM_HVAC_STATE,
+            OID.THERM_FAN_MODE,
+            OID.THERM_SETBACK_HEAT,
+            OID.THERM_SETBACK_COOL,
+            OID.THERM_SETBACK_STATUS,
+            OID.THERM_CURRENT_CLASS,
+        }
+    )
+    _filter_configs = {
+        OID.THERM_SENSOR_TEMP_LOCAL: TEMPERATURE_FILTER,
+        OID.THERM_RELATIVE_HUMIDITY: HUMIDITY_FILTER,
+    }
 
     def __init__(
         self,
@@ -81,7 +99,7 @@ class ProliphixClimate(ProliphixEntity, ClimateEntity):
     @property
     def temperature_unit(self) -> str:
         """Return the unit of measurement."""
-        scale = self.proliphix.temperature_scale
+        scale = self.proliphix.state.temperature_scale
         if scale == PlxTemperatureScale.CELSIUS:
             unit = UnitOfTemperature.CELSIUS
         elif scale == PlxTemperatureScale.FARENHEIT:
@@ -93,83 +111,97 @@ class ProliphixClimate(ProliphixEntity, ClimateEntity):
     @property
     def current_temperature(self) -> float:
         """Return the current temperature."""
-        return self.proliphix.temperature_local
+        return self.proliphix.state.temperature_local
 
     @property
     def target_temperature(self) -> float:
         """Return the target temperature."""
-        if self.proliphix.hvac_mode == PlxHVACMode.AUTO:
-            if self.proliphix.hvac_state in [
+        state = self.proliphix.state
+        if state.hvac_mode == PlxHVACMode.AUTO:
+            if state.hvac_state in [
                 PlxHVACState.HEAT,
                 PlxHVACState.HEAT_2,
                 PlxHVACState.HEAT_3,
             ]:
-                return self.proliphix.setback_heat
-            elif self.proliphix.hvac_state in [PlxHVACState.COOL, PlxHVACState.COOL_2]:
-                return self.proliphix.setback_cool
-        elif self.proliphix.hvac_mode == PlxHVACMode.HEAT:
-            return self.proliphix.setback_heat
-        elif self.proliphix.hvac_mode == PlxHVACMode.COOL:
-            return self.proliphix.setback_cool
+                return state.setback_heat
+            elif state.hvac_state in [PlxHVACState.COOL, PlxHVACState.COOL_2]:
+                return state.setback_cool
+        elif state.hvac_mode == PlxHVACMode.HEAT:
+            return state.setback_heat
+        elif state.hvac_mode == PlxHVACMode.COOL:
+            return state.setback_cool
         else:
             return None
 
     @property
     def target_temperature_high(self) -> float:
         """Return the high target temperature."""
-        if self.proliphix.hvac_mode == PlxHVACMode.AUTO:
-            return self.proliphix.setback_cool
+        state = self.proliphix.state
+        if state.hvac_mode == PlxHVACMode.AUTO:
+            return state.setback_cool
         else:
             return None
 
     @property
     def target_temperature_low(self) -> float:
         """Return the low target temperature."""
-        if self.proliphix.hvac_mode == PlxHVACMode.AUTO:
-            return self.proliphix.setback_heat
+        state = self.proliphix.state
+        if state.hvac_mode == PlxHVACMode.AUTO:
+            return state.setback_heat
         else:
             return None
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
         _LOGGER.debug("Set temperature: %s", kwargs)
+        state = self.proliphix.state
+        written = {}
         if "temperature" in kwargs:
-            if self.proliphix.hvac_mode == PlxHVACMode.HEAT:
-                await self.proliphix.set_setback_heat(kwargs["temperature"])
-            elif self.proliphix.hvac_mode == PlxHVACMode.COOL:
-                await self.proliphix.set_setback_cool(kwargs["temperature"])
-        elif "target_temp_low" in kwargs:
-            await self.proliphix.set_setback_heat(kwargs["target_temp_low"])
-        elif "target_temp_high" in kwargs:
-            await self.proliphix.set_setback_cool(kwargs["target_temp_high"])
-        await asyncio.sleep(1)
-        await self.coordinator.async_refresh()
+            if state.hvac_mode == PlxHVACMode.HEAT:
+                written = await self.proliphix.set_setback_heat(
+                    kwargs["temperature"], optimistic=True, confirm=True
+                )
+            elif state.hvac_mode == PlxHVACMode.COOL:
+                written = await self.proliphix.set_setback_cool(
+                    kwargs["temperature"], optimistic=True, confirm=True
+                )
+        elif "target_temp_low" in kwargs or "target_temp_high" in kwargs:
+            # Write both ends of the range at once
+            written = await self.proliphix.set_setbacks(
+                heat=kwargs.get("target_temp_low"),
+                cool=kwargs.get("target_temp_high"),
+                optimistic=True,
+                confirm=True,
+            )
+        if written:
+            self.coordinator.async_note_write()
 
     @property
     def current_humidity(self) -> float:
         """Return the current humidity."""
-        return self.proliphix.relative_humidity
+        return self.proliphix.state.relative_humidity
 
     @property
     def hvac_action(self):
         """Return the current HVAC action."""
+        state = self.proliphix.state
         action = None
-        if self.proliphix.hvac_mode == PlxHVACMode.OFF:
+        if state.hvac_mode == PlxHVACMode.OFF:
             action = HVACAction.OFF
-        elif self.proliphix.hvac_state in [
+        elif state.hvac_state in [
             PlxHVACState.INITIALIZING,
             PlxHVACState.OFF,
             PlxHVACState.DELAY,
             PlxHVACState.RESET_RELAYS,
         ]:
             action = HVACAction.IDLE
-        elif self.proliphix.hvac_state in [
+        elif state.hvac_state in [
             PlxHVACState.HEAT,
             PlxHVACState.HEAT_2,
             PlxHVACState.HEAT_3,
         ]:
             action = HVACAction.HEATING
-        elif self.proliphix.hvac_state == [PlxHVACState.COOL, PlxHVACState.COOL_2]:
+        elif state.hvac_state in [PlxHVACState.COOL, PlxHVACState.COOL_2]:
             action = HVACAction.COOLING
         else:
             action = HVACAction.IDLE
@@ -194,7 +226,7 @@ class ProliphixClimate(ProliphixEntity, ClimateEntity):
             PlxHVACMode.COOL: HVACMode.COOL,
             PlxHVACMode.AUTO: HVACMode.HEAT_COOL,
         }
-        return mode_map.get(self.proliphix.hvac_mode, HVACMode.OFF)
+        return mode_map.get(self.proliphix.state.hvac_mode, HVACMode.OFF)
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Set new target HVAC mode."""
@@ -209,8 +241,8 @@ class ProliphixClimate(ProliphixEntity, ClimateEntity):
         if mode is None:
             _LOGGER.error("Invalid hvac mode: %s", hvac_mode)
         else:
-            await self.proliphix.set_hvac_mode(mode)
-            await self.coordinator.async_refresh()
+            if await self.proliphix.set_hvac_mode(mode, optimistic=True, confirm=True):
+                self.coordinator.async_note_write()
 
     @property
     def fan_modes(self):
@@ -225,7 +257,7 @@ class ProliphixClimate(ProliphixEntity, ClimateEntity):
             PlxFanMode.ON: FAN_ON,
             PlxFanMode.SCHEDULE: FAN_SCHEDULE,
         }
-        return mode_map.get(self.proliphix.fan_mode, PlxFanMode.AUTO)
+        return mode_map.get(self.proliphix.state.fan_mode, PlxFanMode.AUTO)
 
     async def async_set_fan_mode(self, fan_mode):
         """Set new target fan mode."""
@@ -239,8 +271,8 @@ class ProliphixClimate(ProliphixEntity, ClimateEntity):
         if mode is None:
             _LOGGER.error("Invalid fan mode: %s", fan_mode)
         else:
-            await self.proliphix.set_fan_mode(mode)
-            await self.coordinator.async_refresh()
+            if await self.proliphix.set_fan_mode(mode, optimistic=True, confirm=True):
+                self.coordinator.async_note_write()
 
     @property
     def preset_modes(self) -> list:
@@ -256,23 +288,25 @@ class ProliphixClimate(ProliphixEntity, ClimateEntity):
     @property
     def preset_mode(self):
         """Return current preset mode."""
+        state = self.proliphix.state
         mode = None
-        if self.proliphix.setback_status == PlxSetBackStatus.NORMAL:
-            if self.proliphix.current_class == PlxScheduleClass.IN:
+        if state.setback_status == PlxSetBackStatus.NORMAL:
+            if state.current_class == PlxScheduleClass.IN:
                 mode = PRESET_IN
-            if self.proliphix.current_class == PlxScheduleClass.OUT:
+            if state.current_class == PlxScheduleClass.OUT:
                 mode = PRESET_OUT
-            if self.proliphix.current_class == PlxScheduleClass.AWAY:
+            if state.current_class == PlxScheduleClass.AWAY:
                 mode = PRESET_AWAY
-        elif self.proliphix.setback_status == PlxSetBackStatus.HOLD:
+        elif state.setback_status == PlxSetBackStatus.HOLD:
             mode = PRESET_HOLD
-        elif self.proliphix.setback_status == PlxSetBackStatus.OVERRIDE:
+        elif state.setback_status == PlxSetBackStatus.OVERRIDE:
             mode = PRESET_OVERRIDE
         return mode
 
     async def async_set_preset_mode(self, preset_mode):
         """Set new target preset mode."""
         _LOGGER.debug("Set preset mode: %s", preset_mode)
+        expect = None
         if preset_mode in [PRESET_IN, PRESET_OUT, PRESET_AWAY]:
             schedule_class = getattr(PlxScheduleClass, preset_mode.upper())
             settings = {
@@ -285,6 +319,7 @@ class ProliphixClimate(ProliphixEntity, ClimateEntity):
                 OID.THERM_DEFAULT_CLASS_ID_FRIDAY: schedule_class,
                 OID.THERM_DEFAULT_CLASS_ID_SATURDAY: schedule_class,
             }
+            expect = {OID.THERM_CURRENT_CLASS: schedule_class}
         elif preset_mode == PRESET_HOLD:
             settings = {
                 OID.THERM_SETBACK_STATUS: PlxSetBackStatus.HOLD,
@@ -299,10 +334,12 @@ class ProliphixClimate(ProliphixEntity, ClimateEntity):
             _LOGGER.error("Invalid preset mode: %s", preset_mode)
             return
 
-        await self.proliphix.set_oids(settings)
-        # The set operation will update more than just the settings above,
-        # so force a refresh of the entire thermostat status.  Based on testing,
-        # it takes at least 6 seconds of wait time until the thermostat can
-        # return the updated status.
-        await asyncio.sleep(6)
-        await self.coordinator.async_refresh()
+        # The set operation will update more than just the settings above, and
+        # the thermostat can take several seconds to report the new status, so
+        # show the expected class right away and wait until it has converged.
+        # Most of the settings usually hold the requested values already, so
+        # only write the ones that change.
+        if await self.proliphix.set_oids(
+            settings, optimistic=True, confirm=True, expect=expect, diff=True
+        ):
+            self.coordinator.async_note_write()
@@ -15,12 +15,12 @@ from homeassistant.const import (
     CONF_SSL,
     CONF_USERNAME,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
+from . import UPDATE_INTERVAL
+from .const import CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL, DOMAIN
 from .proliphix.api import Proliphix
 
 _LOGGER = logging.getLogger(__name__)
@@ -41,20 +41,18 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> None:
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
     """
-    session = async_get_clientsession(hass)
-    proliphix = Proliphix(
+    async with Proliphix(
         host=data[CONF_HOST],
         port=data[CONF_PORT],
         username=data[CONF_USERNAME],
         password=data[CONF_PASSWORD],
         ssl=data[CONF_SSL],
-        session=session,
-    )
-    try:
-        await proliphix.connect()
-    except ConnectionError as connection_error:
-        _LOGGER.error("Error connecting to Proliphix: %s", connection_error)
-        raise CannotConnect from connection_error
+    ) as proliphix:
+        try:
+            await proliphix.connect()
+        except ConnectionError as connection_error:
+            _LOGGER.error("Error connecting to Proliphix: %s", connection_error)
+            raise CannotConnect from connection_error
 
     config_entry_name = f"{proliphix.site_name}: " if proliphix.site_name else ""
     config_entry_name += proliphix.name if proliphix.name else proliphix.serial_number
@@ -91,6 +89,44 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=CONNECTION_SCHEMA, errors=errors
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the options of a Proliphix config entry."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        max_update_interval = self._entry.options.get(
+            CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+        )
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    # Seconds between polls once the thermostat has been idle
+                    vol.Required(
+                        CONF_MAX_UPDATE_INTERVAL, default=max_update_interval
+                    ): vol.All(vol.Coerce(int), vol.Range(min=UPDATE_INTERVAL)),
+                }
+            ),
+        )
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -2,6 +2,9 @@
 
 DOMAIN = "proliphix_plus"
 
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+DEFAULT_MAX_UPDATE_INTERVAL = 120
+
 FAN_SCHEDULE = "Schedule"
 
 PRESET_IN = "In"
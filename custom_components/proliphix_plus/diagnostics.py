@@ -0,0 +1,45 @@
+"""Diagnostics support for Proliphix."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from . import ProliphixDataUpdateCoordinator
+from .const import DOMAIN
+from .proliphix.const import OID
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, OID.SERIAL_NUMBER.name}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: ProliphixDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    proliphix = coordinator.proliphix
+    cache = proliphix.cache
+    return async_redact_data(
+        {
+            "entry": dict(entry.data),
+            "coordinator": {
+                "last_update_success": coordinator.last_update_success,
+                "update_interval": coordinator.update_interval.total_seconds(),
+            },
+            "cache": {
+                oid.name: {
+                    "value": cache[oid],
+                    "age": cache.age(oid),
+                    "version": cache.version(oid),
+                    "pending": proliphix.is_pending(oid),
+                }
+                for oid in cache
+            },
+            "metrics": proliphix.metrics.as_dict(),
+        },
+        TO_REDACT,
+    )
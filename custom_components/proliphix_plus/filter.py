@@ -0,0 +1,75 @@
+"""Filtering of noisy Proliphix values before they are written to state."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from operator import attrgetter
+
+from .proliphix.const import OID
+from .proliphix.state import ProliphixState
+
+
+@dataclass(frozen=True)
+class FilterConfig:
+    """How a noisy value is filtered.
+
+    A new value is published once it moves at least deadband away from the
+    last published value, but no sooner than min_interval seconds after it.
+    Smaller changes are still published after max_interval seconds, so the
+    state does not drift away from the thermostat's value.
+    """
+
+    deadband: float
+    min_interval: float = 60
+    max_interval: float = 900
+
+
+TEMPERATURE_FILTER = FilterConfig(deadband=0.5)
+HUMIDITY_FILTER = FilterConfig(deadband=2)
+
+# Decoded values of the OIDs that can be filtered
+FILTERED_VALUES: dict[OID, Callable[[ProliphixState], float | None]] = {
+    OID.THERM_SENSOR_TEMP_LOCAL: attrgetter("temperature_local"),
+    OID.THERM_SENSOR_TEMP_REMOTE_1: attrgetter("temperature_remote_1"),
+    OID.THERM_SENSOR_TEMP_REMOTE_2: attrgetter("temperature_remote_2"),
+    OID.THERM_RELATIVE_HUMIDITY: attrgetter("relative_humidity"),
+}
+
+
+class StateFilter:
+    """Hysteresis filter with a minimum and maximum republish interval."""
+
+    def __init__(self, config: FilterConfig) -> None:
+        """Initialize the filter."""
+        self.config = config
+        self._value: float | None = None
+        self._published_at: float | None = None
+
+    def published(self, value: float | None, now: float) -> None:
+        """Record that a value was written to state."""
+        self._value = value
+        self._published_at = now
+
+    def check(self, value: float | None, now: float) -> bool:
+        """Whether a value should be written to state."""
+        if self._published_at is None or value is None or self._value is None:
+            return value != self._value or self._published_at is None
+        if value == self._value:
+            return False
+        elapsed = now - self._published_at
+        if elapsed < self.config.min_interval:
+            return False
+        return (
+            abs(value - self._value) >= self.config.deadband
+            or elapsed >= self.config.max_interval
+        )
+
+    def recheck_in(self, value: float | None, now: float) -> float | None:
+        """Get the seconds until a held back value should be checked again."""
+        if self._published_at is None or value is None or self._value is None:
+            return None
+        if value == self._value:
+            return None
+        elapsed = now - self._published_at
+        if abs(value - self._value) >= self.config.deadband:
+            return max(self.config.min_interval - elapsed, 0)
+        return max(self.config.max_interval - elapsed, 0)
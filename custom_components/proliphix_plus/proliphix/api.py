@@ -1,14 +1,23 @@
 """Define a base client for interacting with a Proliphix thermostat."""
 
 import asyncio
-from datetime import UTC, datetime, timedelta
-from enum import Enum
+from bisect import bisect_left, bisect_right
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable
+from datetime import datetime, timedelta
+from enum import Enum, IntEnum
+import itertools
 import logging
-from urllib.parse import parse_qs, urlencode
+import time
+from types import TracebackType
+from typing import NamedTuple
+from urllib.parse import urlencode
+import weakref
 
-from aiohttp import BasicAuth, ClientSession
+from aiohttp import ClientSession
 from aiohttp.client_exceptions import ClientError
 
+from .cache import OIDCache
 from .const import (
     MANUFACTURER,
     OID,
@@ -21,11 +30,32 @@ from .const import (
     SetbackStatus,
     TemperatureScale,
 )
+from .events import WATCH_QUEUE_SIZE, ChangeEvent, ChangeSubscription
+from .metrics import ClientMetrics
+from .query import QueryPlan, compile_query, parse_response
+from .schedule import OIDS_DEFAULT_CLASS, OIDS_WEEKLY_SCHEDULE, WeeklySchedule
+from .state import ProliphixState
+from .transport import ProliphixTransport
 
 _LOGGER = logging.getLogger(__name__)
 
 CONNECT_TIMEOUT: int = 30
 UPDATE_TIMEOUT: int = 30
+SLOW_POLL_INTERVAL: int = 300
+SCHEDULE_POLL_INTERVAL: int = 3600
+CONFIRM_TIMEOUT: int = 10
+CONFIRM_INITIAL_DELAY: float = 0.25
+CONFIRM_MAX_DELAY: float = 2
+PENDING_WRITE_TIMEOUT: int = 10
+WRITE_COALESCE_WINDOW: float = 0.25
+DIFF_MAX_AGE: int = 30
+
+# Large reads are split into chunks, to keep each request and response small
+# for the thermostat's embedded web server.  The default fits the core and
+# state OIDs in one request; pass a smaller bulk_chunk_size for a thermostat
+# that struggles with it.
+BULK_CHUNK_SIZE: int = 40
+BULK_CONCURRENCY: int = 1
 
 
 OIDS_CORE = [
@@ -52,6 +82,27 @@ OIDS_SCHEDULE = [
     OID.THERM_PERIOD_START_AWAY_PERIOD_4,
 ]
 
+OIDS_SCHEDULE_PERIODS: dict[ScheduleClass, dict[CurrentPeriod, OID]] = {
+    ScheduleClass.IN: {
+        CurrentPeriod.MORNING: OID.THERM_PERIOD_START_IN_PERIOD_1,
+        CurrentPeriod.DAY: OID.THERM_PERIOD_START_IN_PERIOD_2,
+        CurrentPeriod.EVENING: OID.THERM_PERIOD_START_IN_PERIOD_3,
+        CurrentPeriod.NIGHT: OID.THERM_PERIOD_START_IN_PERIOD_4,
+    },
+    ScheduleClass.OUT: {
+        CurrentPeriod.MORNING: OID.THERM_PERIOD_START_OUT_PERIOD_1,
+        CurrentPeriod.DAY: OID.THERM_PERIOD_START_OUT_PERIOD_2,
+        CurrentPeriod.EVENING: OID.THERM_PERIOD_START_OUT_PERIOD_3,
+        CurrentPeriod.NIGHT: OID.THERM_PERIOD_START_OUT_PERIOD_4,
+    },
+    ScheduleClass.AWAY: {
+        CurrentPeriod.MORNING: OID.THERM_PERIOD_START_AWAY_PERIOD_1,
+        CurrentPeriod.DAY: OID.THERM_PERIOD_START_AWAY_PERIOD_2,
+        CurrentPeriod.EVENING: OID.THERM_PERIOD_START_AWAY_PERIOD_3,
+        CurrentPeriod.NIGHT: OID.THERM_PERIOD_START_AWAY_PERIOD_4,
+    },
+}
+
 OIDS_STATE = [
     OID.SYSTEM_TIME_SECS,
     OID.THERM_SENSOR_TEMP_LOCAL,
@@ -70,20 +121,130 @@ OIDS_STATE = [
     OID.THERM_RELATIVE_HUMIDITY,
     OID.THERM_HOLD_DURATION,
     OID.THERM_HOLD_MODE,
-    OID.THERM_PERIOD_START_IN_PERIOD_1,
-    OID.THERM_PERIOD_START_IN_PERIOD_2,
-    OID.THERM_PERIOD_START_IN_PERIOD_3,
-    OID.THERM_PERIOD_START_IN_PERIOD_4,
-    OID.THERM_PERIOD_START_OUT_PERIOD_1,
-    OID.THERM_PERIOD_START_OUT_PERIOD_2,
-    OID.THERM_PERIOD_START_OUT_PERIOD_3,
-    OID.THERM_PERIOD_START_OUT_PERIOD_4,
-    OID.THERM_PERIOD_START_AWAY_PERIOD_1,
-    OID.THERM_PERIOD_START_AWAY_PERIOD_2,
-    OID.THERM_PERIOD_START_AWAY_PERIOD_3,
-    OID.THERM_PERIOD_START_AWAY_PERIOD_4,
 ]
 
+# OIDs the thermostat may change on its own after another OID is written
+OIDS_WRITE_RELATED: dict[OID, list[OID]] = {
+    OID.THERM_HVAC_MODE: [OID.THERM_HVAC_STATE],
+    OID.THERM_FAN_MODE: [OID.THERM_FAN_STATE],
+    OID.THERM_SETBACK_HEAT: [OID.THERM_SETBACK_STATUS],
+    OID.THERM_SETBACK_COOL: [OID.THERM_SETBACK_STATUS],
+    OID.THERM_HOLD_DURATION: [OID.THERM_SETBACK_STATUS],
+    OID.THERM_SETBACK_STATUS: [
+        OID.THERM_CURRENT_CLASS,
+        OID.THERM_CURRENT_PERIOD,
+        OID.THERM_SETBACK_HEAT,
+        OID.THERM_SETBACK_COOL,
+        OID.THERM_HOLD_DURATION,
+    ],
+    **{
+        oid: [OID.THERM_CURRENT_CLASS, OID.THERM_SETBACK_HEAT, OID.THERM_SETBACK_COOL]
+        for oid in OIDS_DEFAULT_CLASS
+    },
+}
+
+
+class PendingWrite(NamedTuple):
+    """A value written optimistically, but not yet reported by the thermostat."""
+
+    value: str
+    previous: str | None
+    written_at: float
+
+
+class RequestPriority(IntEnum):
+    """Priority of a request to the thermostat, lowest value first."""
+
+    WRITE = 0
+    CONFIRM = 1
+    POLL = 2
+    BACKGROUND = 3
+
+
+class QueuedRequest:
+    """A request waiting to be sent to the thermostat."""
+
+    def __init__(self, endpoint: str, data: bytes, kwargs: dict) -> None:
+        """Initialize the request."""
+        self.endpoint = endpoint
+        self.data = data
+        self.kwargs = kwargs
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class ReadBatch:
+    """OIDs to be read in a single /get request, and the future for its result."""
+
+    def __init__(self, oids: Iterable[OID], priority: RequestPriority) -> None:
+        """Initialize the batch."""
+        self.oids: dict[OID, None] = dict.fromkeys(oids)
+        self.priority = priority
+        # Whether a caller gave up waiting, so the read may be stalled
+        self.abandoned = False
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class PollTier(Enum):
+    """How often an OID needs to be polled."""
+
+    FAST = "fast"  # Every poll
+    SLOW = "slow"  # Every SLOW_POLL_INTERVAL seconds
+    SCHEDULE = "schedule"  # Every SCHEDULE_POLL_INTERVAL seconds
+    STATIC = "static"  # Once, unless invalidated
+
+
+POLL_TIER_INTERVALS: dict[PollTier, int | None] = {
+    PollTier.FAST: 0,
+    PollTier.SLOW: SLOW_POLL_INTERVAL,
+    PollTier.SCHEDULE: SCHEDULE_POLL_INTERVAL,
+    PollTier.STATIC: None,
+}
+
+
+class PollScheduler:
+    """Track which OIDs are due to be polled, based on their tier."""
+
+    def __init__(self, intervals: dict[PollTier, int | None] | None = None) -> None:
+        """Initialize the scheduler."""
+        self._intervals = {**POLL_TIER_INTERVALS, **(intervals or {})}
+        self._tiers: dict[OID, PollTier] = {}
+        self._last_polled: dict[OID, float] = {}
+
+    def register(self, oids: OID | list[OID], tier: PollTier) -> None:
+        """Assign OIDs to a polling tier."""
+        oids = oids if isinstance(oids, list) else [oids]
+        for oid in oids:
+            self._tiers[oid] = tier
+
+    def due(self, now: float | None = None) -> list[OID]:
+        """Get the OIDs that need to be polled now."""
+        now = time.monotonic() if now is None else now
+        due = []
+        for oid, tier in self._tiers.items():
+            last_polled = self._last_polled.get(oid)
+            interval = self._intervals[tier]
+            if last_polled is None or (
+                interval is not None and now - last_polled >= interval
+            ):
+                due.append(oid)
+        return due
+
+    def mark_polled(self, oids: Iterable[OID], now: float | None = None) -> None:
+        """Record that OIDs have just been fetched from the thermostat."""
+        now = time.monotonic() if now is None else now
+        for oid in oids:
+            if oid in self._tiers:
+                self._last_polled[oid] = now
+
+    def tier(self, oid: OID) -> PollTier | None:
+        """Get the polling tier of an OID."""
+        return self._tiers.get(oid)
+
+    def invalidate(self, oids: Iterable[OID]) -> None:
+        """Force OIDs to be polled on the next cycle."""
+        for oid in oids:
+            self._last_polled.pop(oid, None)
+
 
 class Proliphix:
     """Object representing a Proliphix thermostat."""
@@ -97,6 +258,8 @@ class Proliphix:
         ssl: bool = False,
         *,
         session: ClientSession | None = None,
+        write_coalesce_window: float = WRITE_COALESCE_WINDOW,
+        bulk_chunk_size: int = BULK_CHUNK_SIZE,
     ) -> None:
         """Initialize the Proliphix object."""
         self.host: str = host
@@ -105,22 +268,60 @@ class Proliphix:
         self.password = password
         self.ssl = ssl
 
-        self._cache = {}
-        self._change_callbacks = {}
+        self._cache = OIDCache()
+        self._state = ProliphixState(self._cache)
+        self._change_callbacks: dict[
+            OID, list[Callable[[dict[OID, list[str]]], None]]
+        ] = {}
+        self._update_listeners: list[Callable[[dict[OID, list[str]]], None]] = []
+        self._subscriptions: weakref.WeakSet[ChangeSubscription] = weakref.WeakSet()
+        self.metrics = ClientMetrics()
+        self._pending_writes: dict[OID, PendingWrite] = {}
 
-        self._auth: BasicAuth = BasicAuth(self.username, self.password)
-        self._session: ClientSession = session
-        if not self._session or self._session.closed:
-            self._session = ClientSession()
+        self._write_coalesce_window = write_coalesce_window
+        self._write_batch: dict[OID, str] | None = None
+        self._write_future: asyncio.Future | None = None
+        self._write_task: asyncio.Task | None = None
+        self._last_written: dict[OID, str] = {}
+
+        self._read_inflight: ReadBatch | None = None
+        self._read_next: ReadBatch | None = None
+        self._read_task: asyncio.Task | None = None
+        self._bulk_chunk_size = bulk_chunk_size
+
+        self._requests: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._request_seq = itertools.count()
+        self._request_worker: asyncio.Task | None = None
+        self._closed = False
+
+        self._scheduler = PollScheduler()
+        self._scheduler.register(OIDS_CORE, PollTier.STATIC)
+        # Period start times are part of the weekly schedule, but are also
+        # needed for the next period, so they are polled more often
+        self._scheduler.register(OIDS_WEEKLY_SCHEDULE, PollTier.SCHEDULE)
+        self._scheduler.register(OIDS_SCHEDULE, PollTier.SLOW)
+        self._scheduler.register(OIDS_STATE, PollTier.FAST)
+
+        self._transport = ProliphixTransport(
+            self.url,
+            self.username,
+            self.password,
+            session=session,
+            timeout=UPDATE_TIMEOUT,
+        )
 
         self._hold_until = None
-        self._schedule = None
+        self._schedule_key = None
+        self._schedule_transitions = None
+        self._current_schedule_key = None
+        self._current_schedule = None
+        self._weekly_schedule: WeeklySchedule | None = None
 
         self._register_change_callback(
             [OID.THERM_SETBACK_STATUS, OID.THERM_HOLD_DURATION], self._update_hold_until
         )
         self._register_change_callback(
-            [*OIDS_SCHEDULE, OID.SYSTEM_TIME_SECS], self._update_current_schedule
+            OIDS_WEEKLY_SCHEDULE, self._invalidate_weekly_schedule
         )
 
     @property
@@ -131,91 +332,604 @@ class Proliphix:
             protocol = "https"
         return f"{protocol}://{self.host}:{self.port}"
 
-    async def _post(self, endpoint: str, data: dict, **kwargs) -> dict:
-        """Make a POST request to the thermostat."""
+    async def _post(
+        self,
+        endpoint: str,
+        data: bytes,
+        priority: RequestPriority = RequestPriority.POLL,
+        **kwargs,
+    ) -> bytes | None:
+        """Queue a POST request to the thermostat and wait for the response.
+
+        The thermostat handles concurrent requests poorly, so all requests go
+        through a single worker in priority order.  Reads are batched before
+        they get here, by get_oids.
+        """
+        if self._closed:
+            raise self._closed_error()
+        request = QueuedRequest(endpoint, data, kwargs)
+        self._requests.put_nowait((priority, next(self._request_seq), request))
+        if self._request_worker is None or self._request_worker.done():
+            self._request_worker = asyncio.create_task(self._process_requests())
+        return await request.future
+
+    async def _process_requests(self) -> None:
+        """Send queued requests to the thermostat, one at a time.
+
+        Callers time out on their own, without cancelling the request they
+        wait for, so _send gives each request a deadline too.  Otherwise a
+        stalled thermostat would hold the worker, and every request queued
+        behind it.
+        """
+        while True:
+            _, _, request = await self._requests.get()
+            if request.future.done():
+                # The caller has given up waiting
+                continue
+            try:
+                resp = await self._send(
+                    request.endpoint, request.data, **request.kwargs
+                )
+            except asyncio.CancelledError:
+                self._abort(request.future)
+                raise
+            except Exception as e:  # pylint: disable=broad-except
+                if not request.future.done():
+                    request.future.set_exception(e)
+            else:
+                if not request.future.done():
+                    request.future.set_result(resp)
+
+    async def _send(self, endpoint: str, data: bytes, **kwargs) -> bytes | None:
+        """Make a POST request to the thermostat and return the raw response.
+
+        The request times out after UPDATE_TIMEOUT, which is counted in the
+        metrics of its endpoint.
+        """
         url = f"{self.url}{endpoint}"
+        start = time.perf_counter()
         try:
             _LOGGER.debug("POST %s with %s and %s", url, data, kwargs)
-            async with self._session.post(
-                url, data=data, auth=self._auth, **kwargs
-            ) as resp:
-                resp_text = await resp.text()
-                resp_dict = parse_qs(resp_text)
-                _LOGGER.debug(
-                    "POST RESPONSE from %s with %s and %s is: %s",
-                    url,
-                    data,
-                    kwargs,
-                    resp_text,
-                )
-                resp.raise_for_status()
-                return resp_dict
+            async with asyncio.timeout(UPDATE_TIMEOUT):
+                resp_body = await self._transport.post(endpoint, data, **kwargs)
+            self.metrics.record_request(
+                endpoint,
+                time.perf_counter() - start,
+                # Values are urlencoded, so each "=" follows an OID or the submit
+                data.count(b"=") - data.count(b"submit="),
+                len(data),
+                len(resp_body),
+            )
+            _LOGGER.debug(
+                "POST RESPONSE from %s with %s and %s is: %s",
+                url,
+                data,
+                kwargs,
+                resp_body,
+            )
+            return resp_body
+        except TimeoutError:
+            self.metrics.record_failure(endpoint, timeout=True)
+            raise
         except ClientError as e:
+            self.metrics.record_failure(endpoint)
             _LOGGER.error(e)
 
-    def _register_change_callback(self, oids: OID | list[OID], callback) -> None:
-        """Register a callback for a changed OID."""
+    async def close(self) -> None:
+        """Stop background work and close the connection to the thermostat.
+
+        Requests that are waiting or in flight fail with ConnectionError, as
+        do any requests made afterwards.  Subscriptions are closed, which ends
+        their iteration.
+        """
+        self._closed = True
+        for task in (self._request_worker, self._read_task, self._write_task):
+            if task is not None and not task.done():
+                task.cancel()
+        self._request_worker = self._read_task = self._write_task = None
+        while not self._requests.empty():
+            _, _, request = self._requests.get_nowait()
+            self._abort(request.future)
+        for subscription in list(self._subscriptions):
+            subscription.close()
+        await self._transport.close()
+
+    def _closed_error(self) -> ConnectionError:
+        """Get the error for requests that can't be sent because of close()."""
+        return ConnectionError(f"Connection to {self.url} was closed")
+
+    def _abort(self, future: asyncio.Future | None) -> None:
+        """Resolve a future whose work was cancelled.
+
+        If the client was closed, the caller wasn't cancelled itself, so it
+        gets a ConnectionError instead of a CancelledError.
+        """
+        if future is None or future.done():
+            return
+        if self._closed:
+            future.set_exception(self._closed_error())
+        else:
+            future.cancel()
+
+    async def __aenter__(self) -> "Proliphix":
+        """Enter the async context."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Close the connection when leaving the async context."""
+        await self.close()
+
+    def _register_change_callback(
+        self,
+        oids: OID | list[OID],
+        callback: Callable[[dict[OID, list[str]]], None],
+    ) -> None:
+        """Register a callback that depends on the values of OIDs.
+
+        After each cache update, the callback runs once if any of its OIDs
+        changed, with a dict of those OIDs to [old_value, new_value].
+        """
         oids = oids if isinstance(oids, list) else [oids]
         for oid in oids:
-            self._change_callbacks[oid] = callback
+            self._change_callbacks.setdefault(oid, []).append(callback)
+
+    def add_update_listener(
+        self, listener: Callable[[dict[OID, list[str]]], None]
+    ) -> Callable[[], None]:
+        """Register a listener for cache changes, returning a function to remove it.
 
-    def _process_response(self, response: dict) -> dict[OID, str]:
-        """Map a get/set response back to OIDs."""
-        resp = {}
+        The listener is called with a dict of OID to [old_value, new_value]
+        whenever an update changes at least one cached value.
+        """
+        self._update_listeners.append(listener)
+
+        def remove_listener() -> None:
+            self._update_listeners.remove(listener)
+
+        return remove_listener
+
+    def watch(
+        self, oids: OID | list[OID] | None = None, *, maxsize: int = WATCH_QUEUE_SIZE
+    ) -> ChangeSubscription:
+        """Subscribe to changes of OIDs, or of all OIDs if none are given.
+
+        The subscription is an async iterator of ChangeEvents, and starts
+        collecting events right away.  A consumer that falls behind gets the
+        latest value of each OID instead of every change, and never slows down
+        the updates.  Close the subscription, or use it as an async context
+        manager, to stop receiving events.
+        """
+        oids = oids if oids is None or isinstance(oids, list) else [oids]
+        subscription = ChangeSubscription(oids, maxsize, self._subscriptions.discard)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def _process_response(
+        self, response: bytes | None, plan: QueryPlan | None = None
+    ) -> dict[OID, str]:
+        """Map a get/set response back to OIDs, with the plan of the read if any."""
         if response is None:
             # Change this level if useful
             _LOGGER.debug("No response from thermostat")
-            return resp
-        for oid_str, value in response.items():
-            oid_obj = OID.get_by_val(oid_str)
-            resp[oid_obj] = value[0] if value else ""
-        return resp
+            return {}
+        if plan is not None:
+            return plan.parse(response)
+        return parse_response(response)
+
+    def _update_cache(
+        self, oid_dict: dict, fetched: bool = False
+    ) -> dict[OID, list[str]]:
+        """Update the cache with OID data, returning the changes.
 
-    def _update_cache(self, oid_dict: dict) -> None:
-        """Update the cache with OID data."""
+        If the data was read from the thermostat, the fetch time of all of its
+        OIDs is updated, whether or not their values changed.
+        """
+        start = time.perf_counter()
         changes = {}
         for oid, new_value in oid_dict.items():
             if new_value != self._cache.get(oid):
                 old_value = self._cache.get(oid)
                 changes[oid] = [old_value, new_value]
         _LOGGER.debug("Updating cache with these changes: %s", changes)
-        # First update all of the cache values
+        # First update all of the cache values, and decode them once
         for oid, change in changes.items():
             new_value = change[1]
-            self._cache[oid] = new_value
-        # Then call any change callbacks
+            self._cache.set(oid, new_value)
+        if fetched:
+            self._cache.mark_fetched(oid_dict)
+        if changes:
+            self._state = ProliphixState(self._cache)
+        # Then mark the callbacks depending on the changes as dirty, and run
+        # each of them once
+        dirty: dict[Callable, dict[OID, list[str]]] = {}
         for oid, change in changes.items():
-            if oid in self._change_callbacks:
-                old_value = change[0]
-                new_value = change[1]
-                callback = self._change_callbacks[oid]
-                callback(oid, old_value, new_value)
-
-    async def get_oids(self, oids: OID | list[OID]) -> dict[OID, str]:
-        """Get the values of OIDs."""
+            for callback in self._change_callbacks.get(oid, []):
+                dirty.setdefault(callback, {})[oid] = change
+        callbacks_start = time.perf_counter()
+        for callback, callback_changes in dirty.items():
+            callback(callback_changes)
+        # Then queue the changes for the subscribers, without waiting on them
+        if changes and self._subscriptions:
+            events = [
+                ChangeEvent(oid, old_value, new_value, self._cache.version(oid))
+                for oid, (old_value, new_value) in changes.items()
+            ]
+            for subscription in list(self._subscriptions):
+                for event in events:
+                    subscription.push(event)
+        # Finally notify anyone interested in the batch of changes
+        if changes:
+            for listener in list(self._update_listeners):
+                listener(changes)
+        end = time.perf_counter()
+        self.metrics.record_cache_update(end - start, end - callbacks_start)
+        return changes
+
+    async def get_oids(
+        self,
+        oids: OID | list[OID],
+        priority: RequestPriority = RequestPriority.POLL,
+        max_age: float | None = None,
+    ) -> dict[OID, str]:
+        """Get the values of OIDs.
+
+        Only one /get request is in flight at a time.  A request for OIDs that
+        are already being read waits for that read, and other requests that
+        arrive in the meantime are merged into the next batch.  Once a caller
+        has given up on the read in flight, which may be stalled, later
+        requests go into the next batch instead of sharing its fate.  The
+        next batch is sent as soon as the stalled read reaches its deadline.
+
+        With max_age, cached values fetched within max_age seconds are used,
+        and only the other OIDs are read from the thermostat.
+        """
         oids = oids if isinstance(oids, list) else [oids]
-        data = urlencode({k.value: None for k in oids})
-        resp = await self._post("/get", data=data)
-        resp = self._process_response(resp)
-        self._update_cache(resp)
+        if max_age is not None:
+            if stale := self._cache.stale(oids, max_age):
+                await self.get_oids(stale, priority)
+            return {oid: self._cache[oid] for oid in oids if oid in self._cache}
+        wanted = set(oids)
+        for batch in (self._read_inflight, self._read_next):
+            if (
+                batch is not None
+                and not batch.abandoned
+                and wanted <= batch.oids.keys()
+            ):
+                break
+        else:
+            if self._read_inflight is None:
+                batch = self._read_inflight = ReadBatch(oids, priority)
+                self._read_task = asyncio.create_task(self._run_reads())
+            else:
+                if self._read_next is None:
+                    self._read_next = ReadBatch([], priority)
+                batch = self._read_next
+                batch.oids.update(dict.fromkeys(oids))
+                batch.priority = min(batch.priority, priority)
+        try:
+            resp = await asyncio.shield(batch.future)
+        except asyncio.CancelledError:
+            batch.abandoned = True
+            raise
+        return {oid: value for oid, value in resp.items() if oid in wanted}
+
+    async def _run_reads(self) -> None:
+        """Send read batches until none are waiting."""
+        while self._read_inflight is not None:
+            batch = self._read_inflight
+            try:
+                resp = await self._fetch_oids(list(batch.oids), batch.priority)
+            except asyncio.CancelledError:
+                for pending in (batch, self._read_next):
+                    if pending is not None:
+                        self._abort(pending.future)
+                self._read_inflight = self._read_next = self._read_task = None
+                raise
+            except Exception as e:  # pylint: disable=broad-except
+                batch.future.set_exception(e)
+                if batch.abandoned:
+                    # Nobody may be left to retrieve the error
+                    batch.future.exception()
+            else:
+                batch.future.set_result(resp)
+            self._read_inflight, self._read_next = self._read_next, None
+        self._read_task = None
+
+    async def _fetch_oids(
+        self, oids: list[OID], priority: RequestPriority
+    ) -> dict[OID, str]:
+        """Read OIDs from the thermostat and update the cache."""
+        resp = await self._read_oids(oids, priority)
+        self._update_cache(self._reconcile_pending_writes(resp), fetched=True)
         return resp
 
-    async def set_oids(self, oid_values: dict[OID, str]) -> dict[OID, str]:
-        """Set the values of OIDs."""
-        data = (
-            urlencode(
-                {
-                    k.value: v.value if isinstance(v, Enum) else v
-                    for k, v in oid_values.items()
-                }
-            )
-            + "&submit=Submit"
+    async def _read_oids(
+        self, oids: list[OID], priority: RequestPriority
+    ) -> dict[OID, str]:
+        """Read OIDs from the thermostat, without updating the cache.
+
+        Once the thermostat has answered, all of the OIDs are marked as
+        polled, including those it reported no value for.
+        """
+        plan = compile_query(tuple(oids))
+        resp = await self._post("/get", data=plan.body, priority=priority)
+        if resp is not None:
+            self._scheduler.mark_polled(plan.oids)
+        return self._process_response(resp, plan)
+
+    @property
+    def bulk_chunk_size(self) -> int:
+        """Maximum number of OIDs read in one request by bulk reads."""
+        return self._bulk_chunk_size
+
+    async def iter_oids(
+        self,
+        oids: list[OID],
+        *,
+        chunk_size: int | None = None,
+        concurrency: int = BULK_CONCURRENCY,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+    ) -> AsyncIterator[dict[OID, str]]:
+        """Read a large set of OIDs in chunks, yielding the values of each chunk.
+
+        Up to concurrency chunks are queued at a time, and they are yielded in
+        order.  Each chunk is a request of its own, outside of the batching of
+        get_oids, so higher priority requests can go out between them.  The
+        cache is updated once, with the values of all chunks read, when the
+        iteration ends.
+        """
+        chunk_size = chunk_size or self.bulk_chunk_size
+        oids = list(dict.fromkeys(oids))
+        chunks = iter(
+            [oids[i : i + chunk_size] for i in range(0, len(oids), chunk_size)]
         )
-        resp = await self._post("/pdp", data=data)
-        resp = self._process_response(resp)
-        self._update_cache(resp)
+        tasks: deque[asyncio.Task] = deque(
+            asyncio.create_task(self._read_oids(chunk, priority))
+            for chunk in itertools.islice(chunks, max(concurrency, 1))
+        )
+        resp: dict[OID, str] = {}
+        try:
+            while tasks:
+                chunk_resp = await tasks.popleft()
+                if (chunk := next(chunks, None)) is not None:
+                    tasks.append(asyncio.create_task(self._read_oids(chunk, priority)))
+                resp.update(chunk_resp)
+                yield chunk_resp
+        finally:
+            for task in tasks:
+                task.cancel()
+            if resp:
+                self._update_cache(self._reconcile_pending_writes(resp), fetched=True)
+
+    async def get_oids_bulk(
+        self,
+        oids: list[OID],
+        *,
+        chunk_size: int | None = None,
+        concurrency: int = BULK_CONCURRENCY,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+    ) -> dict[OID, str]:
+        """Get the values of a large set of OIDs, read in chunks."""
+        resp: dict[OID, str] = {}
+        async for chunk_resp in self.iter_oids(
+            oids, chunk_size=chunk_size, concurrency=concurrency, priority=priority
+        ):
+            resp.update(chunk_resp)
         return resp
 
+    async def set_oids(
+        self,
+        oid_values: dict[OID, str],
+        *,
+        confirm: bool = False,
+        expect: dict[OID, str] | None = None,
+        optimistic: bool = False,
+        diff: bool = False,
+    ) -> dict[OID, str]:
+        """Set the values of OIDs.
+
+        With optimistic, the written (and expected) values are applied to the
+        cache right away and marked as pending until the thermostat reports
+        them.  With confirm, wait until the thermostat reports the written
+        values (and any additional expected values) before returning.  With
+        diff, only the values that differ from the thermostat's are written,
+        and nothing is sent (an empty dict is returned) if none of them do.
+        """
+        oid_values = {
+            k: str(v.value if isinstance(v, Enum) else v) for k, v in oid_values.items()
+        }
+        if diff:
+            oid_values = await self._diff_oids(oid_values)
+            if not oid_values:
+                _LOGGER.debug("Skipping write, the thermostat already has the values")
+                return {}
+        expected = dict(oid_values)
+        for oid, value in (expect or {}).items():
+            expected[oid] = str(value.value if isinstance(value, Enum) else value)
+        if optimistic:
+            self._apply_optimistic(expected)
+
+        try:
+            resp, sent = await self._queue_write(oid_values)
+        except BaseException:
+            if optimistic:
+                self._rollback_optimistic(expected)
+            raise
+        if not resp:
+            if optimistic:
+                self._rollback_optimistic(expected)
+            return resp
+        if confirm:
+            # Another caller may have written a newer value in the same batch
+            expected.update({oid: sent[oid] for oid in oid_values})
+            await self._confirm_oids(expected)
+        return resp
+
+    async def _diff_oids(self, oid_values: dict[OID, str]) -> dict[OID, str]:
+        """Get the values that differ from the thermostat's current values.
+
+        Cached values older than DIFF_MAX_AGE are read again first.  Values with
+        a pending write are always considered changed.
+        """
+        await self.get_oids(
+            [oid for oid in oid_values if oid not in self._pending_writes],
+            priority=RequestPriority.CONFIRM,
+            max_age=DIFF_MAX_AGE,
+        )
+        return {
+            oid: value
+            for oid, value in oid_values.items()
+            if oid in self._pending_writes or self._cache.get(oid) != value
+        }
+
+    async def _queue_write(
+        self, oid_values: dict[OID, str]
+    ) -> tuple[dict[OID, str], dict[OID, str]]:
+        """Add values to the pending write batch and wait for it to be sent.
+
+        Writes made within the coalescing window are merged into a single /pdp
+        request, with the last write to each OID winning.  Every caller gets
+        the shared response and the values that were actually sent.
+        """
+        if self._write_batch is None:
+            self._write_batch = {}
+            self._write_future = asyncio.get_running_loop().create_future()
+            self._write_task = asyncio.create_task(self._flush_writes())
+        self._write_batch.update(oid_values)
+        return await asyncio.shield(self._write_future)
+
+    async def _flush_writes(self) -> None:
+        """Send the pending write batch once the coalescing window has passed."""
+        try:
+            await asyncio.sleep(self._write_coalesce_window)
+        except asyncio.CancelledError:
+            self._abort(self._write_future)
+            self._write_batch = self._write_future = self._write_task = None
+            raise
+        oid_values, future = self._write_batch, self._write_future
+        self._write_batch = self._write_future = self._write_task = None
+        _LOGGER.debug("Writing coalesced values: %s", oid_values)
+        data = (
+            urlencode({k.value: v for k, v in oid_values.items()}) + "&submit=Submit"
+        ).encode()
+        try:
+            resp = await self._post("/pdp", data=data, priority=RequestPriority.WRITE)
+        except asyncio.CancelledError:
+            self._abort(future)
+            raise
+        except Exception as e:  # pylint: disable=broad-except
+            future.set_exception(e)
+            return
+        self._last_written.update(oid_values)
+        # Re-read written values on the next poll, even for slow polling tiers
+        self._scheduler.invalidate(oid_values)
+        resp = self._process_response(resp)
+        self._update_cache(self._reconcile_pending_writes(resp), fetched=True)
+        future.set_result((resp, oid_values))
+
+    def is_pending(self, oid: OID) -> bool:
+        """Whether an OID holds an optimistic value the thermostat hasn't reported."""
+        return oid in self._pending_writes
+
+    def _apply_optimistic(self, oid_values: dict[OID, str]) -> None:
+        """Apply written values to the cache before the thermostat reports them."""
+        now = time.monotonic()
+        for oid, value in oid_values.items():
+            if oid in self._pending_writes:
+                previous = self._pending_writes[oid].previous
+            else:
+                previous = self._cache.get(oid)
+            self._pending_writes[oid] = PendingWrite(value, previous, now)
+        _LOGGER.debug("Applying optimistic values: %s", oid_values)
+        self._update_cache(oid_values)
+
+    def _rollback_optimistic(self, oid_values: dict[OID, str]) -> None:
+        """Restore the values that were in the cache before a failed write.
+
+        An OID that had no cached value keeps the optimistic one, as there is
+        nothing to restore, and is read again on the next poll.
+        """
+        rollback = {}
+        uncached = []
+        for oid, value in oid_values.items():
+            pending = self._pending_writes.get(oid)
+            if pending is not None and pending.value == value:
+                del self._pending_writes[oid]
+                if pending.previous is None:
+                    uncached.append(oid)
+                else:
+                    rollback[oid] = pending.previous
+        _LOGGER.debug("Rolling back optimistic values: %s", rollback)
+        self._scheduler.invalidate(uncached)
+        self._update_cache(rollback)
+
+    def _reconcile_pending_writes(self, oid_dict: dict[OID, str]) -> dict[OID, str]:
+        """Confirm or roll back pending writes against values read from the thermostat.
+
+        A pending write is confirmed once the thermostat reports its value.  Until
+        PENDING_WRITE_TIMEOUT passes, other values are assumed to be stale and the
+        optimistic value is kept; after that, the thermostat's value wins.
+        """
+        if not self._pending_writes:
+            return oid_dict
+        oid_dict = dict(oid_dict)
+        now = time.monotonic()
+        for oid, pending in list(self._pending_writes.items()):
+            if oid not in oid_dict:
+                continue
+            if oid_dict[oid] == pending.value:
+                del self._pending_writes[oid]
+            elif now - pending.written_at < PENDING_WRITE_TIMEOUT:
+                oid_dict[oid] = pending.value
+            else:
+                _LOGGER.debug(
+                    "Thermostat did not accept %s=%s, rolling back to %s",
+                    oid,
+                    pending.value,
+                    oid_dict[oid],
+                )
+                del self._pending_writes[oid]
+        return oid_dict
+
+    async def _confirm_oids(self, expected: dict[OID, str]) -> bool:
+        """Poll until the thermostat reports the expected OID values.
+
+        Only the expected OIDs and the OIDs known to change along with them are
+        read, with an exponential backoff between reads, until CONFIRM_TIMEOUT.
+        """
+        oids = list(expected)
+        for oid in expected:
+            oids.extend(OIDS_WRITE_RELATED.get(oid, []))
+        oids = list(dict.fromkeys(oids))
+        written = set(expected) & set(self._last_written)
+        delay = CONFIRM_INITIAL_DELAY
+        try:
+            async with asyncio.timeout(CONFIRM_TIMEOUT):
+                while True:
+                    await asyncio.sleep(delay)
+                    await self.get_oids(oids, priority=RequestPriority.CONFIRM)
+                    # Skip values that have since been overwritten by a newer write
+                    if all(
+                        self._cache.get(k) == v and k not in self._pending_writes
+                        for k, v in expected.items()
+                        if k not in written or self._last_written[k] == v
+                    ):
+                        _LOGGER.debug("Thermostat confirmed %s", expected)
+                        return True
+                    delay = min(delay * 2, CONFIRM_MAX_DELAY)
+        except TimeoutError:
+            _LOGGER.debug(
+                "Thermostat did not confirm %s after %s seconds",
+                expected,
+                CONFIRM_TIMEOUT,
+            )
+            return False
+
     async def connect(self) -> None:
         """Connect to the thermostat."""
         try:
@@ -248,7 +962,7 @@ class Proliphix:
         try:
             async with asyncio.timeout(CONNECT_TIMEOUT):
                 _LOGGER.debug("Refreshing schedule attributes")
-                await self.get_oids(OIDS_SCHEDULE)
+                await self.get_oids(OIDS_SCHEDULE, priority=RequestPriority.BACKGROUND)
         except TimeoutError as e:
             _LOGGER.error(
                 "Failed to refresh schedule attributes after %s seconds",
@@ -256,6 +970,52 @@ class Proliphix:
             )
             raise ConnectionError(e) from e
 
+    async def refresh_weekly_schedule(self) -> None:
+        """Update the full weekly schedule in chunked reads."""
+        try:
+            async with asyncio.timeout(UPDATE_TIMEOUT):
+                _LOGGER.debug("Refreshing weekly schedule")
+                await self.get_oids_bulk(OIDS_WEEKLY_SCHEDULE)
+        except TimeoutError as e:
+            _LOGGER.error(
+                "Failed to refresh weekly schedule after %s seconds", UPDATE_TIMEOUT
+            )
+            raise ConnectionError(e) from e
+
+    async def poll(self) -> None:
+        """Update the OIDs that are due for polling.
+
+        The OIDs are read in a single request, unless there are too many of
+        them, as on the first poll.
+        """
+        oids = self._scheduler.due()
+        if not oids:
+            return
+        # Reads of only slow or static OIDs can wait behind everything else
+        priority = RequestPriority.BACKGROUND
+        if any(self._scheduler.tier(oid) == PollTier.FAST for oid in oids):
+            priority = RequestPriority.POLL
+        try:
+            async with asyncio.timeout(UPDATE_TIMEOUT):
+                _LOGGER.debug("Polling %s OIDs", len(oids))
+                if len(oids) > self.bulk_chunk_size:
+                    await self.get_oids_bulk(oids, priority=priority)
+                else:
+                    await self.get_oids(oids, priority=priority)
+        except TimeoutError as e:
+            _LOGGER.error("Failed to poll attributes after %s seconds", UPDATE_TIMEOUT)
+            raise ConnectionError(e) from e
+
+    @property
+    def cache(self) -> OIDCache:
+        """Cached OID values, with their fetch times and versions."""
+        return self._cache
+
+    @property
+    def state(self) -> ProliphixState:
+        """Decoded snapshot of the thermostat state."""
+        return self._state
+
     @property
     def manufacturer(self) -> str | None:
         """Manufacturer name."""
@@ -264,202 +1024,152 @@ class Proliphix:
     @property
     def model(self) -> str | None:
         """Model name."""
-        val = self._cache.get(OID.SYSTEM_MIM_MODEL_NUMBER)
-        if not val:
-            return None
-        return str(val)
+        return self._state.model
 
     @property
     def serial(self) -> str | None:
         """Serial number."""
-        val = self._cache.get(OID.SERIAL_NUMBER)
-        if not val:
-            return None
-        return str(val)
+        return self._state.serial
 
     @property
     def firmware(self) -> str | None:
         """Firmware version."""
-        val = self._cache.get(OID.FIRMWARE_VERSION)
-        if not val:
-            return None
-        return str(val)
+        return self._state.firmware
 
     @property
     def name(self) -> str | None:
         """Device name."""
-        val = self._cache.get(OID.COMMON_DEV_NAME)
-        if not val:
-            return None
-        return str(val)
+        return self._state.name
 
     @property
     def site_name(self) -> str | None:
         """Site name."""
-        val = self._cache.get(OID.SITE_NAME)
-        if not val:
-            return None
-        return str(val)
+        return self._state.site_name
 
     @property
     def temperature_scale(self) -> TemperatureScale | None:
         """Temperature scale (units)."""
-        val = self._cache.get(OID.TEMPERATURE_SCALE)
-        if not val:
-            return None
-        return next((s for s in TemperatureScale if s.value == val), None)
+        return self._state.temperature_scale
 
     @property
     def system_time(self) -> datetime | None:
         """Current system time of the thermostat."""
-        val = self._cache.get(OID.SYSTEM_TIME_SECS)
-        if not val:
-            return None
-        # The system time is in local time, but without offset data
-        systime = datetime.fromtimestamp(int(val), UTC)
-        # Prevent value conversions by overrding the timezone to the correct local one
-        local_tzinfo = datetime.now().astimezone().tzinfo
-        return systime.replace(tzinfo=local_tzinfo)
+        return self._state.system_time
 
     @property
     def temperature_local(self) -> float | None:
         """Local temperature of the thermostat."""
-        val = self._cache.get(OID.THERM_SENSOR_TEMP_LOCAL)
-        if not val:
-            return None
-        return float(val) / 10
+        return self._state.temperature_local
 
     @property
     def temperature_remote_1(self) -> float | None:
         """Temperature of remote sensor 1."""
-        val = self._cache.get(OID.THERM_SENSOR_TEMP_REMOTE_1)
-        if not val or val == "FAILED5":
-            return None
-        return float(val) / 10
+        return self._state.temperature_remote_1
 
     @property
     def temperature_remote_2(self) -> float | None:
         """Temperature of remote sensor 2."""
-        val = self._cache.get(OID.THERM_SENSOR_TEMP_REMOTE_2)
-        if not val or val == "FAILED5":
-            return None
-        return float(val) / 10
+        return self._state.temperature_remote_2
 
     @property
     def hvac_mode(self) -> HVACMode | None:
         """HVAC mode of the thermostat."""
-        val = self._cache.get(OID.THERM_HVAC_MODE)
-        if not val:
-            return None
-        return next((m for m in HVACMode if m.value == val), None)
+        return self._state.hvac_mode
 
-    async def set_hvac_mode(self, mode: HVACMode) -> None:
+    async def set_hvac_mode(self, mode: HVACMode, **kwargs) -> dict[OID, str]:
         """Set the HVAC mode of the thermostat."""
-        await self.set_oids({OID.THERM_HVAC_MODE: mode.value})
+        return await self.set_oids({OID.THERM_HVAC_MODE: mode.value}, **kwargs)
 
     @property
     def hvac_state(self) -> HVACState | None:
         """HVAC state of the thermostat."""
-        val = self._cache.get(OID.THERM_HVAC_STATE)
-        if not val:
-            return None
-        return next((s for s in HVACState if s.value == val), None)
+        return self._state.hvac_state
 
     @property
     def fan_mode(self) -> FanMode | None:
         """Fan mode of the thermostat."""
-        val = self._cache.get(OID.THERM_FAN_MODE)
-        if not val:
-            return None
-        return next((m for m in FanMode if m.value == val), None)
+        return self._state.fan_mode
 
-    async def set_fan_mode(self, mode: FanMode) -> None:
+    async def set_fan_mode(self, mode: FanMode, **kwargs) -> dict[OID, str]:
         """Set the fan mode of the thermostat."""
-        await self.set_oids({OID.THERM_FAN_MODE: mode.value})
+        return await self.set_oids({OID.THERM_FAN_MODE: mode.value}, **kwargs)
 
     @property
     def fan_state(self) -> FanState | None:
         """Fan state of the thermostat."""
-        val = self._cache.get(OID.THERM_FAN_STATE)
-        if not val:
-            return None
-        return next((f for f in FanState if f.value == val), None)
+        return self._state.fan_state
 
     @property
     def setback_heat(self) -> float | None:
         """Target heating temperature."""
-        val = self._cache.get(OID.THERM_SETBACK_HEAT)
-        if not val:
-            return None
-        return float(val) / 10
+        return self._state.setback_heat
 
-    async def set_setback_heat(self, temperature: float) -> None:
+    async def set_setback_heat(self, temperature: float, **kwargs) -> dict[OID, str]:
         """Set the target heating temperature."""
-        await self.set_oids({OID.THERM_SETBACK_HEAT: int(temperature * 10)})
+        return await self.set_oids(
+            {OID.THERM_SETBACK_HEAT: int(temperature * 10)}, **kwargs
+        )
 
     @property
     def setback_cool(self) -> float | None:
         """Target cooling temperature."""
-        val = self._cache.get(OID.THERM_SETBACK_COOL)
-        if not val:
-            return None
-        return float(val) / 10
+        return self._state.setback_cool
 
-    async def set_setback_cool(self, temperature: float) -> None:
+    async def set_setback_cool(self, temperature: float, **kwargs) -> dict[OID, str]:
         """Set the target cooling temperature."""
-        await self.set_oids({OID.THERM_SETBACK_COOL: int(temperature * 10)})
+        return await self.set_oids(
+            {OID.THERM_SETBACK_COOL: int(temperature * 10)}, **kwargs
+        )
+
+    async def set_setbacks(
+        self, heat: float | None = None, cool: float | None = None, **kwargs
+    ) -> dict[OID, str]:
+        """Set the target heating and cooling temperatures in a single write."""
+        oid_values = {}
+        if heat is not None:
+            oid_values[OID.THERM_SETBACK_HEAT] = int(heat * 10)
+        if cool is not None:
+            oid_values[OID.THERM_SETBACK_COOL] = int(cool * 10)
+        if not oid_values:
+            return {}
+        return await self.set_oids(oid_values, **kwargs)
 
     @property
     def setback_status(self) -> SetbackStatus | None:
         """Setback status (normal, hold, override)."""
-        val = self._cache.get(OID.THERM_SETBACK_STATUS)
-        if not val:
-            return None
-        return next((s for s in SetbackStatus if s.value == val), None)
+        return self._state.setback_status
 
     @property
     def current_period(self) -> CurrentPeriod | None:
         """Current schedule period."""
-        val = self._cache.get(OID.THERM_CURRENT_PERIOD)
-        if not val:
-            return None
-        return next((p for p in CurrentPeriod if p.value == val), None)
+        return self._state.current_period
 
     @property
     def current_class(self) -> ScheduleClass | None:
         """Current schedule class (in, out, away)."""
-        val = self._cache.get(OID.THERM_CURRENT_CLASS)
-        if not val:
-            return None
-        return next((c for c in ScheduleClass if c.value == val), None)
+        return self._state.current_class
 
     @property
     def relative_humidity(self) -> float | None:
         """Relative humidity at the thermostat."""
-        if self.model != "NT150":
-            return None
-        val = self._cache.get(OID.THERM_RELATIVE_HUMIDITY)
-        if not val:
-            return None
-        return float(val) / 10
+        return self._state.relative_humidity
 
     @property
     def hold_duration(self) -> int | None:
         """Hours to hold."""
-        val = self._cache.get(OID.THERM_HOLD_DURATION)
-        if not val:
-            return None
-        return int(val)
+        return self._state.hold_duration
 
     @property
-    def next_period(self) -> str | None:
+    def next_period(self) -> CurrentPeriod | None:
         """Next period."""
-        return self._next_period
+        next_period = self._find_next_period()
+        return next_period[1] if next_period else None
 
     @property
-    def next_period_start(self) -> str | None:
+    def next_period_start(self) -> datetime | None:
         """Next period start."""
-        return self._next_period_start
+        next_period = self._find_next_period()
+        return next_period[0] if next_period else None
 
     @property
     def hold_until(self) -> str | None:
@@ -467,13 +1177,47 @@ class Proliphix:
         return self._hold_until
 
     @property
-    def current_schedule(self) -> str | None:
-        """Current schedule (computed property)."""
+    def current_schedule(
+        self,
+    ) -> dict[ScheduleClass, dict[CurrentPeriod, datetime]] | None:
+        """Next start of each period, by schedule class (computed property)."""
+        system_time = self._state.system_time
+        transitions = self._get_schedule_transitions()
+        if transitions is None:
+            return None
+        key = (self._schedule_key, system_time)
+        if self._current_schedule_key != key:
+            current_schedule = {}
+            for schedule_class, (starts, periods) in transitions.items():
+                # Transitions cover today and tomorrow, so the first occurrence
+                # of each period from now on is its next start
+                next_starts = {}
+                for i in range(bisect_left(starts, system_time), len(starts)):
+                    next_starts.setdefault(periods[i], starts[i])
+                current_schedule[schedule_class] = {
+                    period: next_starts[period]
+                    for period in OIDS_SCHEDULE_PERIODS[schedule_class]
+                }
+            self._current_schedule_key = key
+            self._current_schedule = current_schedule
         return self._current_schedule
 
-    def _update_hold_until(self, oid: OID, from_val: str, to_val: str) -> None:
+    @property
+    def weekly_schedule(self) -> WeeklySchedule | None:
+        """Full weekly schedule (computed property)."""
+        if self._weekly_schedule is None and any(
+            oid in self._cache for oid in OIDS_DEFAULT_CLASS
+        ):
+            self._weekly_schedule = WeeklySchedule(self._cache)
+        return self._weekly_schedule
+
+    def _invalidate_weekly_schedule(self, changes: dict[OID, list[str]]) -> None:
+        """Rebuild the weekly schedule on next use."""
+        self._weekly_schedule = None
+
+    def _update_hold_until(self, changes: dict[OID, list[str]]) -> None:
         """Update the hold until time."""
-        _LOGGER.debug("Updating hold until time due to change in %s", oid)
+        _LOGGER.debug("Updating hold until time due to change in %s", list(changes))
         if self.setback_status == SetbackStatus.HOLD and self.hold_duration is not None:
             if self.hold_duration == 0:
                 self._hold_until = datetime.max
@@ -484,43 +1228,46 @@ class Proliphix:
         else:
             self._hold_until = None
 
-    def _update_current_schedule(self, oid: OID, from_val: str, to_val: str) -> None:
-        today = self.system_time.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        def get_dt(oid: OID) -> datetime:
-            mins_after_midnight = int(self._cache.get(oid, 0))
-            result = today + timedelta(minutes=mins_after_midnight)
-            if result < self.system_time:
-                result = today + timedelta(days=1, minutes=mins_after_midnight)
-            return result
-
-        current_schedule = {
-            ScheduleClass.IN: {
-                CurrentPeriod.MORNING: get_dt(OID.THERM_PERIOD_START_IN_PERIOD_1),
-                CurrentPeriod.DAY: get_dt(OID.THERM_PERIOD_START_IN_PERIOD_2),
-                CurrentPeriod.EVENING: get_dt(OID.THERM_PERIOD_START_IN_PERIOD_3),
-                CurrentPeriod.NIGHT: get_dt(OID.THERM_PERIOD_START_IN_PERIOD_4),
-            },
-            ScheduleClass.OUT: {
-                CurrentPeriod.MORNING: get_dt(OID.THERM_PERIOD_START_OUT_PERIOD_1),
-                CurrentPeriod.DAY: get_dt(OID.THERM_PERIOD_START_OUT_PERIOD_2),
-                CurrentPeriod.EVENING: get_dt(OID.THERM_PERIOD_START_OUT_PERIOD_3),
-                CurrentPeriod.NIGHT: get_dt(OID.THERM_PERIOD_START_OUT_PERIOD_4),
-            },
-            ScheduleClass.AWAY: {
-                CurrentPeriod.MORNING: get_dt(OID.THERM_PERIOD_START_AWAY_PERIOD_1),
-                CurrentPeriod.DAY: get_dt(OID.THERM_PERIOD_START_AWAY_PERIOD_2),
-                CurrentPeriod.EVENING: get_dt(OID.THERM_PERIOD_START_AWAY_PERIOD_3),
-                CurrentPeriod.NIGHT: get_dt(OID.THERM_PERIOD_START_AWAY_PERIOD_4),
-            },
-        }
-        self._current_schedule = current_schedule
-
-        next_period = None
-        next_period_start = datetime.max.replace(tzinfo=UTC)
-        for period, start in current_schedule[self.current_class].items():
-            if start > self.system_time and start <= next_period_start:
-                next_period = period
-                next_period_start = start
-        self._next_period = next_period
-        self._next_period_start = next_period_start
+    def _get_schedule_transitions(
+        self,
+    ) -> dict[ScheduleClass, tuple[list[datetime], list[CurrentPeriod]]] | None:
+        """Get the sorted period start times for today and tomorrow, by class.
+
+        The result only depends on the thermostat's calendar day and the period
+        start values, so it is computed on first use and memoized on those.
+        """
+        system_time = self._state.system_time
+        if system_time is None:
+            return None
+        today = system_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        key = (today, tuple(self._cache.get(oid) for oid in OIDS_SCHEDULE))
+        if self._schedule_key != key:
+            transitions = {}
+            for schedule_class, period_oids in OIDS_SCHEDULE_PERIODS.items():
+                entries = []
+                for period, oid in period_oids.items():
+                    mins_after_midnight = int(self._cache.get(oid) or 0)
+                    for days in (0, 1):
+                        start = today + timedelta(
+                            days=days, minutes=mins_after_midnight
+                        )
+                        entries.append((start, period))
+                entries.sort(key=lambda entry: entry[0])
+                transitions[schedule_class] = (
+                    [start for start, _ in entries],
+                    [period for _, period in entries],
+                )
+            self._schedule_key = key
+            self._schedule_transitions = transitions
+        return self._schedule_transitions
+
+    def _find_next_period(self) -> tuple[datetime, CurrentPeriod] | None:
+        """Find the next period start of the current class."""
+        transitions = self._get_schedule_transitions()
+        if transitions is None or self._state.current_class not in transitions:
+            return None
+        starts, periods = transitions[self._state.current_class]
+        i = bisect_right(starts, self._state.system_time)
+        if i == len(starts):
+            return None
+        return starts[i], periods[i]
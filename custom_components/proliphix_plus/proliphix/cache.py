@@ -0,0 +1,86 @@
+"""Cache of the OID values read from a Proliphix thermostat."""
+
+from collections.abc import Iterable, Iterator, Mapping
+import itertools
+import time
+from typing import NamedTuple
+
+from .const import OID
+
+
+class CacheEntry(NamedTuple):
+    """A cached OID value, when it was last fetched and its version."""
+
+    value: str | None
+    fetched_at: float | None
+    version: int
+
+
+class OIDCache(Mapping[OID, str]):
+    """OID values, with the time each was last fetched and a version.
+
+    The cache is a read-only mapping of OID to value, so it can be decoded
+    directly.  Versions increase every time a value changes, across all OIDs,
+    so a version also orders changes.  Fetch times come from time.monotonic()
+    and are only recorded for values read from the thermostat.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the cache."""
+        self._values: dict[OID, str] = {}
+        self._fetched_at: dict[OID, float] = {}
+        self._versions: dict[OID, int] = {}
+        self._version_seq = itertools.count(1)
+
+    def __getitem__(self, oid: OID) -> str:
+        """Get a cached value."""
+        return self._values[oid]
+
+    def __iter__(self) -> Iterator[OID]:
+        """Iterate over the cached OIDs."""
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        """Get the number of cached OIDs."""
+        return len(self._values)
+
+    def set(self, oid: OID, value: str) -> int:
+        """Change a cached value, returning its new version."""
+        self._values[oid] = value
+        version = self._versions[oid] = next(self._version_seq)
+        return version
+
+    def mark_fetched(self, oids: Iterable[OID], now: float | None = None) -> None:
+        """Record that OIDs have just been read from the thermostat."""
+        now = time.monotonic() if now is None else now
+        for oid in oids:
+            self._fetched_at[oid] = now
+
+    def entry(self, oid: OID) -> CacheEntry:
+        """Get the cached value of an OID with its metadata."""
+        return CacheEntry(
+            self._values.get(oid), self._fetched_at.get(oid), self._versions.get(oid, 0)
+        )
+
+    def version(self, oid: OID) -> int:
+        """Get the version of a cached value, 0 if it was never cached."""
+        return self._versions.get(oid, 0)
+
+    def age(self, oid: OID, now: float | None = None) -> float | None:
+        """Get the seconds since an OID was last fetched, if it has been."""
+        fetched_at = self._fetched_at.get(oid)
+        if fetched_at is None:
+            return None
+        return (time.monotonic() if now is None else now) - fetched_at
+
+    def stale(
+        self, oids: Iterable[OID], max_age: float, now: float | None = None
+    ) -> list[OID]:
+        """Get the OIDs that were not fetched within max_age seconds."""
+        now = time.monotonic() if now is None else now
+        return [
+            oid
+            for oid in oids
+            if (fetched_at := self._fetched_at.get(oid)) is None
+            or now - fetched_at > max_age
+        ]
@@ -0,0 +1,96 @@
+"""Streams of changes to the OID values of a Proliphix thermostat."""
+
+import asyncio
+from collections import deque
+from collections.abc import Callable, Iterable
+from types import TracebackType
+from typing import NamedTuple
+
+from .const import OID
+
+WATCH_QUEUE_SIZE: int = 100
+
+
+class ChangeEvent(NamedTuple):
+    """A change of a cached OID value."""
+
+    oid: OID
+    old_value: str | None
+    new_value: str | None
+    version: int
+
+
+class ChangeSubscription:
+    """Async iterator over the changes to a set of OIDs.
+
+    Events are queued without ever blocking the producer.  When the queue is
+    full because the consumer has fallen behind, the queued events are
+    coalesced to the latest value per OID, so the queue never grows beyond the
+    number of watched OIDs that changed.
+    """
+
+    def __init__(
+        self,
+        oids: Iterable[OID] | None,
+        maxsize: int,
+        unsubscribe: Callable[["ChangeSubscription"], None],
+    ) -> None:
+        """Initialize the subscription, for all OIDs if oids is None."""
+        self.oids = frozenset(oids) if oids is not None else None
+        self._maxsize = maxsize
+        self._unsubscribe = unsubscribe
+        self._queue: deque[ChangeEvent] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def push(self, event: ChangeEvent) -> None:
+        """Queue an event for the consumer."""
+        if self._closed or (self.oids is not None and event.oid not in self.oids):
+            return
+        self._queue.append(event)
+        if len(self._queue) > self._maxsize:
+            self._coalesce()
+        self._ready.set()
+
+    def _coalesce(self) -> None:
+        """Keep only the latest value of each OID in the queue."""
+        latest: dict[OID, ChangeEvent] = {}
+        for event in self._queue:
+            first = latest.pop(event.oid, None)
+            latest[event.oid] = (
+                event if first is None else event._replace(old_value=first.old_value)
+            )
+        self._queue = deque(latest.values())
+
+    def close(self) -> None:
+        """Stop receiving events, ending the iteration."""
+        if not self._closed:
+            self._closed = True
+            self._unsubscribe(self)
+            self._ready.set()
+
+    def __aiter__(self) -> "ChangeSubscription":
+        """Iterate over the events."""
+        return self
+
+    async def __anext__(self) -> ChangeEvent:
+        """Wait for the next event."""
+        while not self._queue:
+            if self._closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        return self._queue.popleft()
+
+    async def __aenter__(self) -> "ChangeSubscription":
+        """Enter the async context."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Close the subscription when leaving the async context."""
+        self.close()
@@ -0,0 +1,193 @@
+"""Lightweight request and cache metrics for a Proliphix client."""
+
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+
+class LatencyHistogram:
+    """Histogram of latencies over fixed buckets."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        """Initialize the histogram."""
+        # The last bucket counts the latencies above the last bound
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record a latency."""
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float | None:
+        """Mean latency, in seconds."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, pct: float) -> float | None:
+        """Estimate a percentile, as the upper bound of its bucket, in seconds.
+
+        The estimate never exceeds the largest latency recorded.
+        """
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if i < len(LATENCY_BUCKETS):
+                    return min(LATENCY_BUCKETS[i], self.max)
+                return self.max
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Describe the histogram, with latencies in milliseconds."""
+        buckets = [f"<={bound * 1000:g}ms" for bound in LATENCY_BUCKETS]
+        buckets.append(f">{LATENCY_BUCKETS[-1] * 1000:g}ms")
+        return {
+            "count": self.count,
+            "mean_ms": _ms(self.mean),
+            "p50_ms": _ms(self.percentile(50)),
+            "p99_ms": _ms(self.percentile(99)),
+            "max_ms": _ms(self.max if self.count else None),
+            "buckets": dict(zip(buckets, self.counts, strict=True)),
+        }
+
+
+class EndpointMetrics:
+    """Metrics of the requests made to one endpoint."""
+
+    __slots__ = (
+        "latency",
+        "requests",
+        "failures",
+        "timeouts",
+        "bytes_sent",
+        "bytes_received",
+        "oids",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.oids = 0
+
+    @property
+    def oids_per_request(self) -> float | None:
+        """Mean number of OIDs per request."""
+        return self.oids / self.requests if self.requests else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Describe the metrics."""
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "oids_per_request": self.oids_per_request,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class ClientMetrics:
+    """Metrics of a client's requests to its thermostat and cache updates."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.cache_updates = 0
+        self.cache_update_time = 0.0
+        self.callback_time = 0.0
+
+    def endpoint(self, endpoint: str) -> EndpointMetrics:
+        """Get the metrics of an endpoint."""
+        metrics = self.endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self.endpoints[endpoint] = EndpointMetrics()
+        return metrics
+
+    def record_request(
+        self,
+        endpoint: str,
+        seconds: float,
+        oids: int,
+        bytes_sent: int,
+        bytes_received: int,
+    ) -> None:
+        """Record a successful request."""
+        metrics = self.endpoint(endpoint)
+        metrics.requests += 1
+        metrics.latency.record(seconds)
+        metrics.oids += oids
+        metrics.bytes_sent += bytes_sent
+        metrics.bytes_received += bytes_received
+
+    def record_failure(self, endpoint: str, timeout: bool = False) -> None:
+        """Record a failed request."""
+        metrics = self.endpoint(endpoint)
+        if timeout:
+            metrics.timeouts += 1
+        else:
+            metrics.failures += 1
+
+    def record_cache_update(self, seconds: float, callback_seconds: float) -> None:
+        """Record the time spent updating the cache, and in its callbacks."""
+        self.cache_updates += 1
+        self.cache_update_time += seconds
+        self.callback_time += callback_seconds
+
+    @property
+    def errors(self) -> int:
+        """Total number of failed and timed out requests."""
+        return sum(m.failures + m.timeouts for m in self.endpoints.values())
+
+    @property
+    def cache_update_mean(self) -> float | None:
+        """Mean time spent per cache update, in seconds."""
+        if not self.cache_updates:
+            return None
+        return self.cache_update_time / self.cache_updates
+
+    def as_dict(self) -> dict[str, Any]:
+        """Describe the metrics."""
+        return {
+            "endpoints": {
+                endpoint: metrics.as_dict()
+                for endpoint, metrics in self.endpoints.items()
+            },
+            "cache_updates": self.cache_updates,
+            "cache_update_ms": self.cache_update_time * 1000,
+            "callback_ms": self.callback_time * 1000,
+        }
+
+
+def _ms(seconds: float | None) -> float | None:
+    """Convert seconds to milliseconds."""
+    return None if seconds is None else seconds * 1000
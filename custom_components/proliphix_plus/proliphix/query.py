@@ -0,0 +1,100 @@
+"""Precompiled read requests and a fast parser for the thermostat's responses."""
+
+from collections.abc import Iterable
+from functools import lru_cache
+from urllib.parse import unquote_plus, urlencode
+
+from .const import OID
+from .state import SENSOR_FAILED
+
+QUERY_PLAN_CACHE_SIZE: int = 64
+
+# OIDs by their name, as it appears in requests and responses
+_OIDS_BY_KEY: dict[bytes, OID] = {oid.value.encode(): oid for oid in OID}
+_SENSOR_FAILED = SENSOR_FAILED.encode()
+
+
+def _decode_value(raw: bytes) -> str:
+    """Decode a urlencoded value."""
+    if raw == _SENSOR_FAILED:
+        # Reported by every disconnected sensor, on every poll
+        return SENSOR_FAILED
+    if b"%" in raw or b"+" in raw:
+        return unquote_plus(raw.decode(errors="replace"))
+    return raw.decode(errors="replace")
+
+
+def parse_response(body: bytes) -> dict[OID, str]:
+    """Map a get/set response body to OID values.
+
+    Like parse_qs, empty values are skipped, so that an OID the thermostat has
+    no value for keeps its cached value.  Unknown OIDs are skipped too.
+    """
+    values: dict[OID, str] = {}
+    end = len(body)
+    pos = 0
+    while pos < end:
+        amp = body.find(b"&", pos)
+        if amp < 0:
+            amp = end
+        eq = body.find(b"=", pos, amp)
+        if eq > pos and eq + 1 < amp:
+            oid = _OIDS_BY_KEY.get(body[pos:eq])
+            if oid is not None:
+                values[oid] = _decode_value(body[eq + 1 : amp])
+        pos = amp + 1
+    return values
+
+
+class QueryPlan:
+    """Read request for a fixed set of OIDs, compiled once.
+
+    The request body is encoded when the plan is created.  The thermostat
+    answers in the order of the request, so the response is parsed straight
+    from its raw bytes by matching each field against the OID expected in
+    its slot.  Fields that are not in the expected order, if the thermostat
+    ever skips or reorders any, are looked up instead.
+    """
+
+    __slots__ = ("oids", "body", "_keys")
+
+    def __init__(self, oids: Iterable[OID]) -> None:
+        """Compile the request for the OIDs."""
+        self.oids: tuple[OID, ...] = tuple(dict.fromkeys(oids))
+        self.body: bytes = urlencode({oid.value: None for oid in self.oids}).encode()
+        self._keys: tuple[bytes, ...] = tuple(
+            oid.value.encode() + b"=" for oid in self.oids
+        )
+
+    def parse(self, body: bytes) -> dict[OID, str]:
+        """Map a response body to OID values, like parse_response."""
+        values: dict[OID, str] = {}
+        oids = self.oids
+        keys = self._keys
+        slots = len(keys)
+        slot = 0
+        end = len(body)
+        pos = 0
+        while pos < end:
+            amp = body.find(b"&", pos)
+            if amp < 0:
+                amp = end
+            if slot < slots and body.startswith(keys[slot], pos, amp):
+                start = pos + len(keys[slot])
+                if start < amp:
+                    values[oids[slot]] = _decode_value(body[start:amp])
+                slot += 1
+            else:
+                eq = body.find(b"=", pos, amp)
+                if eq > pos and eq + 1 < amp:
+                    oid = _OIDS_BY_KEY.get(body[pos:eq])
+                    if oid is not None:
+                        values[oid] = _decode_value(body[eq + 1 : amp])
+            pos = amp + 1
+        return values
+
+
+@lru_cache(maxsize=QUERY_PLAN_CACHE_SIZE)
+def compile_query(oids: tuple[OID, ...]) -> QueryPlan:
+    """Get the compiled read request for a set of OIDs."""
+    return QueryPlan(oids)
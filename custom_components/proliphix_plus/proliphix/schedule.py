@@ -0,0 +1,339 @@
+"""Model of a Proliphix thermostat's weekly schedule."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from .const import OID, CurrentPeriod, FanSetback, ScheduleClass
+
+SCHEDULE_CLASSES = (ScheduleClass.IN, ScheduleClass.OUT, ScheduleClass.AWAY)
+SCHEDULE_PERIODS = (
+    CurrentPeriod.MORNING,
+    CurrentPeriod.DAY,
+    CurrentPeriod.EVENING,
+    CurrentPeriod.NIGHT,
+)
+SPECIAL_DAY_SLOTS = 20
+
+# Fields of each schedule period, in storage order
+PERIOD_FIELDS = ("START", "SETBACK_HEAT", "SETBACK_COOL", "SETBACK_FAN")
+FIELD_START = 0
+FIELD_HEAT = 1
+FIELD_COOL = 2
+FIELD_FAN = 3
+
+# Fields of each special day, in storage order
+SPECIAL_DAY_FIELDS = ("INDEX", "START_DAY", "MONTH", "YEAR", "DURATION", "CLASS")
+SPECIAL_START_DAY = 1
+SPECIAL_MONTH = 2
+SPECIAL_YEAR = 3
+SPECIAL_DURATION = 4
+SPECIAL_CLASS = 5
+
+# Stored for values that are missing or not numeric
+MISSING = -1
+
+OIDS_PERIODS = [
+    OID[f"THERM_PERIOD_{field}_{schedule_class.name}_PERIOD_{period}"]
+    for schedule_class in SCHEDULE_CLASSES
+    for period in range(1, len(SCHEDULE_PERIODS) + 1)
+    for field in PERIOD_FIELDS
+]
+
+# Sunday first, as numbered by the thermostat
+OIDS_DEFAULT_CLASS = [
+    OID.THERM_DEFAULT_CLASS_ID_SUNDAY,
+    OID.THERM_DEFAULT_CLASS_ID_MONDAY,
+    OID.THERM_DEFAULT_CLASS_ID_TUESDAY,
+    OID.THERM_DEFAULT_CLASS_ID_WEDNESDAY,
+    OID.THERM_DEFAULT_CLASS_ID_THURSDAY,
+    OID.THERM_DEFAULT_CLASS_ID_FRIDAY,
+    OID.THERM_DEFAULT_CLASS_ID_SATURDAY,
+]
+
+OIDS_SPECIAL_DAYS = [
+    OID[f"THERM_SCHEDULE_SPECIAL_{field}_{slot}"]
+    for slot in range(1, SPECIAL_DAY_SLOTS + 1)
+    for field in SPECIAL_DAY_FIELDS
+]
+
+OIDS_WEEKLY_SCHEDULE = OIDS_PERIODS + OIDS_DEFAULT_CLASS + OIDS_SPECIAL_DAYS
+
+
+class ScheduleSetpoints(NamedTuple):
+    """Setpoints in effect according to the schedule."""
+
+    schedule_class: ScheduleClass
+    period: CurrentPeriod
+    start: datetime
+    heat: float | None
+    cool: float | None
+    fan: FanSetback | None
+
+
+class SpecialDay(NamedTuple):
+    """Range of days that follow a specific schedule class."""
+
+    start: date
+    end: date  # Exclusive
+    schedule_class: ScheduleClass
+
+
+def _to_int(val: str | None) -> int:
+    """Convert a cached value for compact storage."""
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        return MISSING
+
+
+def _to_tenths(val: int) -> float | None:
+    """Convert a stored value in tenths of a degree."""
+    return None if val == MISSING else val / 10
+
+
+class WeeklySchedule:
+    """Compact, array-backed model of the thermostat's weekly schedule.
+
+    Periods are stored as class x period x (start, heat, cool, fan), next to a
+    day -> class table and the special days table.  Sorted start times per
+    class and sorted special days allow lookups by bisection.
+    """
+
+    __slots__ = (
+        "_periods",
+        "_day_classes",
+        "_special_days",
+        "_starts",
+        "_start_periods",
+        "_special_ranges",
+        "_special_starts",
+    )
+
+    def __init__(self, cache: Mapping[OID, str]) -> None:
+        """Build the schedule from cached OID values."""
+        self._periods = array("h", (_to_int(cache.get(oid)) for oid in OIDS_PERIODS))
+        self._day_classes = array(
+            "b", (_to_int(cache.get(oid)) for oid in OIDS_DEFAULT_CLASS)
+        )
+        self._special_days = array(
+            "h", (_to_int(cache.get(oid)) for oid in OIDS_SPECIAL_DAYS)
+        )
+
+        # Period start minutes per class, sorted, with the matching period index
+        self._starts: list[array] = []
+        self._start_periods: list[array] = []
+        for class_index in range(len(SCHEDULE_CLASSES)):
+            entries = sorted(
+                (self._get(class_index, period_index, FIELD_START), period_index)
+                for period_index in range(len(SCHEDULE_PERIODS))
+                if self._get(class_index, period_index, FIELD_START) != MISSING
+            )
+            self._starts.append(array("h", (start for start, _ in entries)))
+            self._start_periods.append(array("b", (period for _, period in entries)))
+
+        self._special_ranges: list[SpecialDay] = sorted(
+            filter(
+                None,
+                (self._decode_special_day(slot) for slot in range(SPECIAL_DAY_SLOTS)),
+            ),
+            key=lambda special_day: special_day.start,
+        )
+        self._special_starts = [
+            special_day.start.toordinal() for special_day in self._special_ranges
+        ]
+
+    def _get(self, class_index: int, period_index: int, field: int) -> int:
+        """Get a stored period value."""
+        index = (class_index * len(SCHEDULE_PERIODS) + period_index) * len(
+            PERIOD_FIELDS
+        ) + field
+        return self._periods[index]
+
+    def _decode_special_day(self, slot: int) -> SpecialDay | None:
+        """Decode a special day slot, if it is in use."""
+        values = self._special_days[
+            slot * len(SPECIAL_DAY_FIELDS) : (slot + 1) * len(SPECIAL_DAY_FIELDS)
+        ]
+        duration = values[SPECIAL_DURATION]
+        schedule_class = ScheduleClass._value2member_map_.get(
+            str(values[SPECIAL_CLASS])
+        )
+        if duration <= 0 or schedule_class not in SCHEDULE_CLASSES:
+            return None
+        year = values[SPECIAL_YEAR]
+        if 0 <= year < 100:
+            year += 2000
+        try:
+            start = date(year, values[SPECIAL_MONTH], values[SPECIAL_START_DAY])
+        except ValueError:
+            return None
+        return SpecialDay(start, start + timedelta(days=duration), schedule_class)
+
+    @property
+    def special_days(self) -> list[SpecialDay]:
+        """Special days, sorted by start."""
+        return list(self._special_ranges)
+
+    def default_class(self, day: date) -> ScheduleClass | None:
+        """Get the default schedule class for a day of the week."""
+        # date.weekday() is Monday first, the thermostat is Sunday first
+        value = self._day_classes[(day.weekday() + 1) % 7]
+        return ScheduleClass._value2member_map_.get(str(value))
+
+    def class_on(self, day: date) -> ScheduleClass | None:
+        """Get the schedule class that applies on a day."""
+        i = bisect_right(self._special_starts, day.toordinal()) - 1
+        if i >= 0 and day < self._special_ranges[i].end:
+            return self._special_ranges[i].schedule_class
+        return self.default_class(day)
+
+    def period_starts(
+        self, schedule_class: ScheduleClass
+    ) -> list[tuple[int, CurrentPeriod]]:
+        """Get the start (minutes after midnight) of each period of a class, sorted."""
+        class_index = SCHEDULE_CLASSES.index(schedule_class)
+        return [
+            (start, SCHEDULE_PERIODS[period_index])
+            for start, period_index in zip(
+                self._starts[class_index],
+                self._start_periods[class_index],
+                strict=True,
+            )
+        ]
+
+    def setpoints(
+        self, schedule_class: ScheduleClass, period: CurrentPeriod
+    ) -> tuple[float | None, float | None, FanSetback | None]:
+        """Get the heat, cool and fan setpoints of a period."""
+        class_index = SCHEDULE_CLASSES.index(schedule_class)
+        period_index = SCHEDULE_PERIODS.index(period)
+        fan = self._get(class_index, period_index, FIELD_FAN)
+        return (
+            _to_tenths(self._get(class_index, period_index, FIELD_HEAT)),
+            _to_tenths(self._get(class_index, period_index, FIELD_COOL)),
+            FanSetback._value2member_map_.get(str(fan)),
+        )
+
+    def setpoints_at(self, when: datetime) -> ScheduleSetpoints | None:
+        """Get the setpoints in effect at a point in time."""
+        day = when.date()
+        midnight = when.replace(hour=0, minute=0, second=0, microsecond=0)
+        minutes = when.hour * 60 + when.minute
+        # Before the first period of the day, the last period of the previous
+        # day is still in effect
+        for _ in range(2):
+            schedule_class = self.class_on(day)
+            if schedule_class in SCHEDULE_CLASSES:
+                class_index = SCHEDULE_CLASSES.index(schedule_class)
+                starts = self._starts[class_index]
+                i = bisect_right(starts, minutes) - 1
+                if i >= 0:
+                    period = SCHEDULE_PERIODS[self._start_periods[class_index][i]]
+                    return ScheduleSetpoints(
+                        schedule_class,
+                        period,
+                        midnight + timedelta(minutes=starts[i]),
+                        *self.setpoints(schedule_class, period),
+                    )
+            day -= timedelta(days=1)
+            midnight -= timedelta(days=1)
+            minutes = 24 * 60
+        return None
+
+
+class ScheduleEvent(NamedTuple):
+    """A schedule period, from its start until the next period starts."""
+
+    start: datetime
+    end: datetime
+    schedule_class: ScheduleClass
+    period: CurrentPeriod
+
+
+class ScheduleIndex:
+    """Sorted schedule transitions over a range of days.
+
+    The index is precomputed from a WeeklySchedule, so range queries are
+    answered by bisection without touching the thermostat.  Times are naive
+    and in the thermostat's local time.
+    """
+
+    __slots__ = (
+        "schedule",
+        "first_day",
+        "last_day",
+        "_events",
+        "_starts",
+        "_ends",
+        "_special_days",
+        "_special_starts",
+    )
+
+    def __init__(self, schedule: WeeklySchedule, first_day: date, days: int) -> None:
+        """Build the index for the days from first_day on."""
+        self.schedule = schedule
+        self.first_day = first_day
+        self.last_day = first_day + timedelta(days=days)
+
+        # Start from the day before, to know which period is in effect at the
+        # start of the first day, and include the day after to know when the
+        # last period ends
+        transitions: list[tuple[datetime, ScheduleClass, CurrentPeriod]] = []
+        day = first_day - timedelta(days=1)
+        while day <= self.last_day:
+            schedule_class = schedule.class_on(day)
+            if schedule_class in SCHEDULE_CLASSES:
+                midnight = datetime.combine(day, datetime.min.time())
+                transitions.extend(
+                    (midnight + timedelta(minutes=start), schedule_class, period)
+                    for start, period in schedule.period_starts(schedule_class)
+                )
+            day += timedelta(days=1)
+
+        self._events = [
+            ScheduleEvent(start, end, schedule_class, period)
+            for (start, schedule_class, period), (end, _, _) in zip(
+                transitions, transitions[1:], strict=False
+            )
+        ]
+        self._starts = [event.start for event in self._events]
+        self._ends = [event.end for event in self._events]
+
+        self._special_days = [
+            special_day
+            for special_day in schedule.special_days
+            if special_day.end > first_day and special_day.start < self.last_day
+        ]
+        self._special_starts = [special_day.start for special_day in self._special_days]
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        """Whether the index covers a time range."""
+        return datetime.combine(
+            self.first_day, datetime.min.time()
+        ) <= start and end <= datetime.combine(self.last_day, datetime.min.time())
+
+    def events_between(self, start: datetime, end: datetime) -> list[ScheduleEvent]:
+        """Get the periods that overlap a time range."""
+        return self._events[
+            bisect_right(self._ends, start) : bisect_left(self._starts, end)
+        ]
+
+    def event_at(self, when: datetime) -> ScheduleEvent | None:
+        """Get the period in effect at a point in time."""
+        i = bisect_right(self._starts, when) - 1
+        if i >= 0 and when < self._ends[i]:
+            return self._events[i]
+        return None
+
+    def special_days_between(self, start: date, end: date) -> list[SpecialDay]:
+        """Get the special days that overlap a range of days."""
+        return [
+            special_day
+            for special_day in self._special_days[
+                : bisect_left(self._special_starts, end)
+            ]
+            if special_day.end > start
+        ]
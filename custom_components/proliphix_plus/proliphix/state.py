@@ -0,0 +1,185 @@
+"""Decoded snapshot of a Proliphix thermostat's state."""
+
+from collections.abc import Mapping
+from datetime import UTC, datetime, tzinfo
+from enum import Enum
+from typing import Any
+
+from .const import (
+    OID,
+    CurrentPeriod,
+    FanMode,
+    FanState,
+    HVACMode,
+    HVACState,
+    ScheduleClass,
+    SetbackStatus,
+    TemperatureScale,
+)
+
+# Returned by the thermostat for sensors that are not connected
+SENSOR_FAILED = "FAILED5"
+
+
+def _decode_str(val: str | None) -> str | None:
+    """Decode a string value."""
+    if not val:
+        return None
+    return str(val)
+
+
+def _decode_int(val: str | None) -> int | None:
+    """Decode an integer value."""
+    if not val:
+        return None
+    return int(val)
+
+
+def _decode_tenths(val: str | None) -> float | None:
+    """Decode a value reported in tenths of a unit."""
+    if not val or val == SENSOR_FAILED:
+        return None
+    return float(val) / 10
+
+
+def _decode_enum(enum: type[Enum], val: str | None) -> Enum | None:
+    """Decode an enum value."""
+    if not val:
+        return None
+    return enum._value2member_map_.get(val)
+
+
+def _decode_time(val: str | None, local_tzinfo: tzinfo | None) -> datetime | None:
+    """Decode the thermostat's system time."""
+    if not val:
+        return None
+    # The system time is in local time, but without offset data
+    systime = datetime.fromtimestamp(int(val), UTC)
+    # Prevent value conversions by overrding the timezone to the correct local one
+    return systime.replace(tzinfo=local_tzinfo)
+
+
+class ProliphixState:
+    """Immutable snapshot of the decoded values in the OID cache."""
+
+    __slots__ = (
+        "model",
+        "serial",
+        "firmware",
+        "name",
+        "site_name",
+        "temperature_scale",
+        "system_time",
+        "temperature_local",
+        "temperature_remote_1",
+        "temperature_remote_2",
+        "hvac_mode",
+        "hvac_state",
+        "fan_mode",
+        "fan_state",
+        "setback_heat",
+        "setback_cool",
+        "setback_status",
+        "current_period",
+        "current_class",
+        "relative_humidity",
+        "hold_duration",
+    )
+
+    model: str | None
+    serial: str | None
+    firmware: str | None
+    name: str | None
+    site_name: str | None
+    temperature_scale: TemperatureScale | None
+    system_time: datetime | None
+    temperature_local: float | None
+    temperature_remote_1: float | None
+    temperature_remote_2: float | None
+    hvac_mode: HVACMode | None
+    hvac_state: HVACState | None
+    fan_mode: FanMode | None
+    fan_state: FanState | None
+    setback_heat: float | None
+    setback_cool: float | None
+    setback_status: SetbackStatus | None
+    current_period: CurrentPeriod | None
+    current_class: ScheduleClass | None
+    relative_humidity: float | None
+    hold_duration: int | None
+
+    def __init__(self, cache: Mapping[OID, str]) -> None:
+        """Decode the cached OID values."""
+        init = object.__setattr__
+        model = _decode_str(cache.get(OID.SYSTEM_MIM_MODEL_NUMBER))
+        init(self, "model", model)
+        init(self, "serial", _decode_str(cache.get(OID.SERIAL_NUMBER)))
+        init(self, "firmware", _decode_str(cache.get(OID.FIRMWARE_VERSION)))
+        init(self, "name", _decode_str(cache.get(OID.COMMON_DEV_NAME)))
+        init(self, "site_name", _decode_str(cache.get(OID.SITE_NAME)))
+        init(
+            self,
+            "temperature_scale",
+            _decode_enum(TemperatureScale, cache.get(OID.TEMPERATURE_SCALE)),
+        )
+        init(
+            self,
+            "system_time",
+            _decode_time(
+                cache.get(OID.SYSTEM_TIME_SECS), datetime.now().astimezone().tzinfo
+            ),
+        )
+        init(
+            self,
+            "temperature_local",
+            _decode_tenths(cache.get(OID.THERM_SENSOR_TEMP_LOCAL)),
+        )
+        init(
+            self,
+            "temperature_remote_1",
+            _decode_tenths(cache.get(OID.THERM_SENSOR_TEMP_REMOTE_1)),
+        )
+        init(
+            self,
+            "temperature_remote_2",
+            _decode_tenths(cache.get(OID.THERM_SENSOR_TEMP_REMOTE_2)),
+        )
+        init(self, "hvac_mode", _decode_enum(HVACMode, cache.get(OID.THERM_HVAC_MODE)))
+        init(
+            self, "hvac_state", _decode_enum(HVACState, cache.get(OID.THERM_HVAC_STATE))
+        )
+        init(self, "fan_mode", _decode_enum(FanMode, cache.get(OID.THERM_FAN_MODE)))
+        init(self, "fan_state", _decode_enum(FanState, cache.get(OID.THERM_FAN_STATE)))
+        init(self, "setback_heat", _decode_tenths(cache.get(OID.THERM_SETBACK_HEAT)))
+        init(self, "setback_cool", _decode_tenths(cache.get(OID.THERM_SETBACK_COOL)))
+        init(
+            self,
+            "setback_status",
+            _decode_enum(SetbackStatus, cache.get(OID.THERM_SETBACK_STATUS)),
+        )
+        init(
+            self,
+            "current_period",
+            _decode_enum(CurrentPeriod, cache.get(OID.THERM_CURRENT_PERIOD)),
+        )
+        init(
+            self,
+            "current_class",
+            _decode_enum(ScheduleClass, cache.get(OID.THERM_CURRENT_CLASS)),
+        )
+        init(
+            self,
+            "relative_humidity",
+            _decode_tenths(cache.get(OID.THERM_RELATIVE_HUMIDITY))
+            if model == "NT150"
+            else None,
+        )
+        init(self, "hold_duration", _decode_int(cache.get(OID.THERM_HOLD_DURATION)))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Prevent changes to the snapshot."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        """Prevent changes to the snapshot."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
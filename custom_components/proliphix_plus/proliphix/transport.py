@@ -0,0 +1,105 @@
+"""HTTP transport for a Proliphix thermostat."""
+
+import logging
+from types import TracebackType
+
+from aiohttp import BasicAuth, ClientSession, ClientTimeout, TCPConnector, hdrs
+from aiohttp.client_exceptions import ClientOSError, ServerDisconnectedError
+
+_LOGGER = logging.getLogger(__name__)
+
+# The thermostat's web server only copes with one connection at a time, but
+# is happy to keep it open between requests.
+LIMIT_PER_HOST: int = 1
+KEEPALIVE_TIMEOUT: int = 30
+DNS_CACHE_TTL: int = 300
+# Instead of aiohttp's default of 5 minutes, which would outlive the callers
+REQUEST_TIMEOUT: int = 30
+# Request bodies are urlencoded, but have always been sent as text
+CONTENT_TYPE: str = "text/plain; charset=utf-8"
+
+
+class ProliphixTransport:
+    """Keep-alive HTTP connection to a single Proliphix thermostat."""
+
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        *,
+        session: ClientSession | None = None,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> None:
+        """Initialize the transport.
+
+        If no session is provided, a dedicated one is created on first use with
+        a connector tuned for the thermostat, and closed by close().  Requests
+        time out after timeout seconds, whichever session they use.
+        """
+        self.base_url = base_url
+        self._auth = BasicAuth(username, password)
+        self._timeout = ClientTimeout(total=timeout)
+        self._session = session
+        self._owns_session = session is None
+
+    def _get_session(self) -> ClientSession:
+        """Get the session, creating a dedicated one if needed."""
+        if self._session is None or (self._owns_session and self._session.closed):
+            connector = TCPConnector(
+                limit_per_host=LIMIT_PER_HOST,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                use_dns_cache=True,
+                ttl_dns_cache=DNS_CACHE_TTL,
+            )
+            self._session = ClientSession(
+                connector=connector, auth=self._auth, timeout=self._timeout
+            )
+            self._owns_session = True
+        return self._session
+
+    async def post(self, endpoint: str, data: bytes, **kwargs) -> bytes:
+        """Make a POST request and return the raw response body.
+
+        The thermostat may close a kept-alive connection at any time, so a
+        request that fails because of that is retried once on a new connection.
+        """
+        session = self._get_session()
+        url = f"{self.base_url}{endpoint}"
+        # A dedicated session already carries the credentials
+        auth = None if self._owns_session else self._auth
+        headers = {hdrs.CONTENT_TYPE: CONTENT_TYPE, **kwargs.pop("headers", {})}
+        kwargs.setdefault("timeout", self._timeout)
+        retried = False
+        while True:
+            try:
+                async with session.post(
+                    url, data=data, auth=auth, headers=headers, **kwargs
+                ) as resp:
+                    resp_body = await resp.read()
+                    resp.raise_for_status()
+                    return resp_body
+            except (ServerDisconnectedError, ClientOSError) as e:
+                if retried:
+                    raise
+                retried = True
+                _LOGGER.debug("Connection to %s was closed, reconnecting: %s", url, e)
+
+    async def close(self) -> None:
+        """Close the dedicated session, if one was created."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "ProliphixTransport":
+        """Enter the async context."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Close the transport when leaving the async context."""
+        await self.close()
@@ -1,23 +1,30 @@
 """Sensors for Proliphix."""
 
 from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import logging
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import EntityCategory, UnitOfTemperature
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 
 from . import ProliphixDataUpdateCoordinator, ProliphixEntity
 from .const import DOMAIN
-from .proliphix.const import TemperatureScale
+from .filter import TEMPERATURE_FILTER, FilterConfig
+from .proliphix.const import OID, TemperatureScale
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,6 +34,34 @@ class ProliphixSensorDescriptionMixin:
     """Mixin for Proliphix sensor."""
 
     value_fn: Callable[[ProliphixEntity], StateType]
+    # OIDs the value depends on, or None for values that are not read from
+    # the thermostat and may change on any update
+    oids: tuple[OID, ...] | None = None
+    filters: dict[OID, FilterConfig] = field(default_factory=dict)
+
+
+def _latency_ms(endpoint: str, pct: float) -> Callable[[ProliphixEntity], StateType]:
+    """Get a percentile of the request latency of an endpoint, in milliseconds."""
+
+    def value_fn(entity: ProliphixEntity) -> StateType:
+        metrics = entity.proliphix.metrics.endpoints.get(endpoint)
+        latency = metrics.latency.percentile(pct) if metrics else None
+        return None if latency is None else round(latency * 1000, 1)
+
+    return value_fn
+
+
+def _oids_per_read(entity: ProliphixEntity) -> StateType:
+    """Get the mean number of OIDs per read request."""
+    metrics = entity.proliphix.metrics.endpoints.get("/get")
+    oids_per_request = metrics.oids_per_request if metrics else None
+    return None if oids_per_request is None else round(oids_per_request, 1)
+
+
+def _cache_update_ms(entity: ProliphixEntity) -> StateType:
+    """Get the mean time spent per cache update, in milliseconds."""
+    mean = entity.proliphix.metrics.cache_update_mean
+    return None if mean is None else round(mean * 1000, 3)
 
 
 @dataclass(frozen=True)
@@ -41,7 +76,78 @@ SENSORS: tuple[ProliphixSensorDescription, ...] = (
         key="temperature_local",
         name="Temperature",
         entity_category=EntityCategory.DIAGNOSTIC,
-        value_fn=lambda entity: entity.proliphix.temperature_local,
+        value_fn=lambda entity: entity.proliphix.state.temperature_local,
+        oids=(OID.THERM_SENSOR_TEMP_LOCAL, OID.TEMPERATURE_SCALE),
+        filters={OID.THERM_SENSOR_TEMP_LOCAL: TEMPERATURE_FILTER},
+    ),
+    ProliphixSensorDescription(
+        key="read_latency_p50",
+        name="Read latency p50",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=_latency_ms("/get", 50),
+    ),
+    ProliphixSensorDescription(
+        key="read_latency_p99",
+        name="Read latency p99",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=_latency_ms("/get", 99),
+    ),
+    ProliphixSensorDescription(
+        key="write_latency_p99",
+        name="Write latency p99",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=_latency_ms("/pdp", 99),
+    ),
+    ProliphixSensorDescription(
+        key="request_errors",
+        name="Request errors",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda entity: entity.proliphix.metrics.errors,
+    ),
+    ProliphixSensorDescription(
+        key="bytes_received",
+        name="Data received",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        value_fn=lambda entity: sum(
+            metrics.bytes_received
+            for metrics in entity.proliphix.metrics.endpoints.values()
+        ),
+    ),
+    ProliphixSensorDescription(
+        key="oids_per_read",
+        name="OIDs per read",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_oids_per_read,
+    ),
+    ProliphixSensorDescription(
+        key="cache_update_time",
+        name="Cache update time",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=_cache_update_ms,
     ),
 )
 
@@ -72,6 +178,9 @@ class ProliphixSensorEntity(ProliphixEntity, SensorEntity):
     ) -> None:
         """Set up the instance."""
         self.entity_description = entity_description
+        if entity_description.oids is not None:
+            self._oids = frozenset(entity_description.oids)
+        self._filter_configs = entity_description.filters
         super().__init__(coordinator)
 
     @property
@@ -84,8 +193,9 @@ class ProliphixSensorEntity(ProliphixEntity, SensorEntity):
         """Return the native unit of measurement."""
         unit = self.entity_description.native_unit_of_measurement
         if self.device_class == SensorDeviceClass.TEMPERATURE:
-            if self.proliphix.temperature_scale == TemperatureScale.FARENHEIT:
+            scale = self.proliphix.state.temperature_scale
+            if scale == TemperatureScale.FARENHEIT:
                 unit = UnitOfTemperature.FAHRENHEIT
-            elif self.proliphix.temperature_scale == TemperatureScale.CELSIUS:
+            elif scale == TemperatureScale.CELSIUS:
                 unit = UnitOfTemperature.CELSIUS
         return unit